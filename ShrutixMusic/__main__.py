@@ -6,24 +6,38 @@ from pytgcalls.exceptions import NoActiveGroupCall
 
 import config
 from ShrutixMusic import LOGGER, nand, userbot
+from ShrutixMusic.core.cache import (
+    downloadcache,
+    playbackcache,
+    thumbcache,
+    transcodecache,
+)
 from ShrutixMusic.core.call import Shruti
+from ShrutixMusic.core.extractor import extractor
+from ShrutixMusic.core.http import http
 from ShrutixMusic.misc import sudo
 from ShrutixMusic.plugins import ALL_MODULES
-from ShrutixMusic.utils.database import get_banned_users, get_gbanned
+from ShrutixMusic.utils.database import (
+    get_banned_users,
+    get_gbanned,
+    load_chat_settings,
+)
+from ShrutixMusic.utils.thumbnails import start_renderer, stop_renderer
 from config import BANNED_USERS
 
 
 async def init():
-    if (
-        not config.STRING1
-        and not config.STRING2
-        and not config.STRING3
-        and not config.STRING4
-        and not config.STRING5
-    ):
+    if not config.STRING_SESSIONS:
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
+    extractor.start()
+    start_renderer()
+    await http.start()
     await sudo()
+    downloadcache.load()
+    playbackcache.load()
+    transcodecache.load()
+    thumbcache.load()
     try:
         users = await get_gbanned()
         for user_id in users:
@@ -33,6 +47,11 @@ async def init():
             BANNED_USERS.add(user_id)
     except:
         pass
+    try:
+        chats = await load_chat_settings()
+        LOGGER("ShrutixMusic").info(f"Loaded settings of {chats} chats.")
+    except Exception as e:
+        LOGGER("ShrutixMusic").warning(f"Failed to load chat settings: {e}")
     await nand.start()
     for all_module in ALL_MODULES:
         importlib.import_module("ShrutixMusic.plugins" + all_module)
@@ -53,6 +72,13 @@ async def init():
     "\x53\x68\x72\x75\x74\x69\x78\x20\x4d\x75\x73\x69\x63\x20\x42\x6f\x74\x20\x53\x74\x61\x72\x74\x65\x64\x20\x53\x75\x63\x63\x65\x73\x73\x66\x75\x6c\x6c\x79\x2e\n\n\x44\x6f\x6e'\x74\x20\x66\x6f\x72\x67\x65\x74\x20\x74\x6f\x20\x76\x69\x73\x69\x74\x20\x40\x53\x68\x72\x75\x74\x69\x42\x6f\x74\x73"
 )
     await idle()
+    downloadcache.save()
+    playbackcache.save()
+    transcodecache.save()
+    thumbcache.save()
+    extractor.stop()
+    stop_renderer()
+    await http.close()
     await nand.stop()
     await userbot.stop()
     LOGGER("ShrutixMusic").info("Stopping ShrutixMusic Music Bot...")
@@ -0,0 +1,142 @@
+import time
+from collections import deque
+
+
+class Assistant:
+    __slots__ = (
+        "number",
+        "client",
+        "chats",
+        "pending",
+        "ping",
+        "errors",
+        "floods",
+        "cooldown",
+    )
+
+    def __init__(self, number: int, client):
+        self.number = number
+        self.client = client
+        self.chats = set()
+        self.pending = {}
+        self.ping = 0.0
+        self.errors = deque()
+        self.floods = deque()
+        self.cooldown = 0
+
+
+class AssistantRegistry:
+    def __init__(self, window: int = 600, max_errors: int = 5, reserve: int = 60):
+        self.window = window
+        self.max_errors = max_errors
+        self.reserve = reserve
+        self.assistants = {}
+        self.pytgcalls = {}
+        self.chats = {}
+
+    def __contains__(self, number) -> bool:
+        return number in self.assistants
+
+    def add(self, number: int, client):
+        self.assistants[number] = Assistant(number, client)
+
+    def remove(self, number: int):
+        assistant = self.assistants.pop(number, None)
+        if assistant:
+            for chat_id in assistant.chats:
+                self.chats.pop(chat_id, None)
+
+    def add_calls(self, number: int, calls):
+        self.pytgcalls[number] = calls
+
+    def get(self, number) -> Assistant:
+        return self.assistants.get(int(number))
+
+    def client(self, number):
+        assistant = self.assistants.get(int(number))
+        return assistant.client if assistant else None
+
+    def calls(self, number):
+        return self.pytgcalls.get(int(number))
+
+    def prune(self, assistant: Assistant):
+        now = time.monotonic()
+        expired = now - self.window
+        for events in (assistant.errors, assistant.floods):
+            while events and events[0] < expired:
+                events.popleft()
+        for chat_id, until in list(assistant.pending.items()):
+            if until < now:
+                assistant.pending.pop(chat_id)
+
+    def busy(self, assistant: Assistant) -> int:
+        self.prune(assistant)
+        return len(assistant.chats) + len(assistant.pending)
+
+    def error(self, number, flood: int = 0):
+        assistant = self.get(number)
+        if not assistant:
+            return
+        now = time.monotonic()
+        if flood:
+            assistant.floods.append(now)
+            assistant.cooldown = max(assistant.cooldown, now + flood)
+        else:
+            assistant.errors.append(now)
+        self.prune(assistant)
+
+    def set_ping(self, number, ping: float):
+        assistant = self.get(number)
+        if assistant:
+            assistant.ping = ping
+
+    def healthy(self, assistant: Assistant) -> bool:
+        self.prune(assistant)
+        if assistant.cooldown > time.monotonic():
+            return False
+        return len(assistant.errors) + len(assistant.floods) < self.max_errors
+
+    def join(self, number, chat_id: int):
+        self.leave(chat_id)
+        assistant = self.get(number) if number else None
+        if assistant:
+            assistant.pending.pop(chat_id, None)
+            assistant.chats.add(chat_id)
+            self.chats[chat_id] = assistant.number
+
+    def leave(self, chat_id: int):
+        number = self.chats.pop(chat_id, None)
+        if number in self.assistants:
+            self.assistants[number].chats.discard(chat_id)
+        for assistant in self.assistants.values():
+            assistant.pending.pop(chat_id, None)
+
+    def pick(self, chat_id: int = None) -> int:
+        if not self.assistants:
+            return None
+        candidates = [x for x in self.assistants.values() if self.healthy(x)]
+        if not candidates:
+            candidates = list(self.assistants.values())
+        assistant = min(
+            candidates,
+            key=lambda x: (self.busy(x), len(x.errors) + len(x.floods), x.ping),
+        )
+        if chat_id is not None:
+            assistant.pending[chat_id] = time.monotonic() + self.reserve
+        return assistant.number
+
+    def load(self) -> list:
+        return [
+            (
+                x.number,
+                len(x.chats),
+                x.ping,
+                len(x.errors),
+                len(x.floods),
+                self.healthy(x),
+            )
+            for x in self.assistants.values()
+        ]
+
+
+registry = AssistantRegistry()
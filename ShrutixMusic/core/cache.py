@@ -0,0 +1,196 @@
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+
+import config
+
+from ..logging import LOGGER
+
+
+class FileCache:
+    def __init__(self, path: str, max_size: int, min_free: int):
+        self.path = os.path.abspath(path)
+        self.max_size = max_size
+        self.min_free = min_free
+        self.index = os.path.join(self.path, "index.json")
+        self.files = OrderedDict()
+        self.refs = {}
+        self.meta = {}
+        self.size = 0
+        self.dirty = False
+
+    def key(self, file):
+        if not file:
+            return None
+        file = os.path.abspath(str(file))
+        if os.path.dirname(file) != self.path or file == self.index:
+            return None
+        return file
+
+    def load(self):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        try:
+            with open(self.index) as f:
+                saved = json.load(f)
+        except:
+            saved = {}
+        found = []
+        for entry in os.scandir(self.path):
+            if not entry.is_file() or entry.path == self.index:
+                continue
+            if entry.name.endswith((".part", ".ytdl", ".temp")):
+                try:
+                    os.remove(entry.path)
+                except:
+                    pass
+                continue
+            stat = entry.stat()
+            used = saved.get(entry.name, stat.st_mtime)
+            meta = None
+            if isinstance(used, list):
+                used, meta = used
+            found.append((used, entry.path, stat.st_size, meta))
+        self.files.clear()
+        self.meta.clear()
+        self.size = 0
+        for used, file, size, meta in sorted(found, key=lambda x: x[:2]):
+            self.files[file] = [size, used]
+            self.size += size
+            if meta is not None:
+                self.meta[file] = meta
+        self.evict()
+        self.save()
+        LOGGER(__name__).info(
+            f"Loaded {len(self.files)} cached files from {os.path.basename(self.path)}."
+        )
+
+    def save(self):
+        data = {
+            os.path.basename(k): [v[1], self.meta[k]] if k in self.meta else v[1]
+            for k, v in self.files.items()
+        }
+        temp = f"{self.index}.tmp"
+        try:
+            with open(temp, "w") as f:
+                json.dump(data, f)
+            os.replace(temp, self.index)
+            self.dirty = False
+        except Exception as e:
+            LOGGER(__name__).warning(f"Failed to save cache index: {e}")
+
+    def free(self) -> int:
+        try:
+            return shutil.disk_usage(self.path).free
+        except:
+            return self.min_free
+
+    def insert(self, file):
+        key = self.key(file)
+        if not key:
+            return None
+        if key in self.files:
+            self.files.move_to_end(key)
+            self.files[key][1] = time.time()
+            return key
+        try:
+            size = os.path.getsize(key)
+        except OSError:
+            return None
+        self.files[key] = [size, time.time()]
+        self.size += size
+        self.dirty = True
+        return key
+
+    def annotate(self, file, value):
+        key = self.key(file)
+        if key in self.files:
+            self.meta[key] = value
+            self.dirty = True
+
+    def touch(self, file):
+        key = self.insert(file)
+        if key:
+            self.evict(key)
+        return key
+
+    def acquire(self, file):
+        key = self.insert(file)
+        if key:
+            self.refs[key] = self.refs.get(key, 0) + 1
+            self.evict()
+
+    def release(self, file):
+        key = self.key(file)
+        if not key:
+            return
+        count = self.refs.get(key, 0) - 1
+        if count > 0:
+            self.refs[key] = count
+        else:
+            self.refs.pop(key, None)
+            self.evict()
+        if self.dirty:
+            self.save()
+
+    def evict(self, keep=None):
+        if self.size <= self.max_size and self.free() >= self.min_free:
+            return
+        for key in list(self.files):
+            if self.size <= self.max_size and self.free() >= self.min_free:
+                break
+            if key == keep or self.refs.get(key):
+                continue
+            self.remove(key)
+
+    def remove(self, key):
+        size, _ = self.files.pop(key)
+        self.meta.pop(key, None)
+        self.size -= size
+        self.dirty = True
+        try:
+            os.remove(key)
+        except:
+            pass
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+
+    def get(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires < time.monotonic():
+            del self.data[key]
+            return None
+        self.data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: int = None):
+        self.data[key] = (value, time.monotonic() + (ttl or self.ttl))
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def pop(self, key):
+        item = self.data.pop(key, None)
+        return item[0] if item else None
+
+
+downloadcache = FileCache(
+    "downloads", config.DOWNLOADS_CACHE_LIMIT, config.DOWNLOADS_MIN_FREE
+)
+playbackcache = FileCache(
+    "playback", config.PLAYBACK_CACHE_LIMIT, config.DOWNLOADS_MIN_FREE
+)
+transcodecache = FileCache(
+    "transcoded", config.TRANSCODE_CACHE_LIMIT, config.DOWNLOADS_MIN_FREE
+)
+thumbcache = FileCache("cache", config.THUMB_CACHE_LIMIT, config.DOWNLOADS_MIN_FREE)
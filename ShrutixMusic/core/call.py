@@ -3,7 +3,7 @@ import os
 from datetime import datetime, timedelta
 from typing import Union
 
-from pyrogram import Client
+from pyrogram.errors import FloodWait
 from pyrogram.types import InlineKeyboardMarkup
 from pytgcalls import PyTgCalls, StreamType
 from pytgcalls.exceptions import (
@@ -17,99 +17,82 @@ from pytgcalls.types.input_stream.quality import HighQualityAudio, MediumQuality
 from pytgcalls.types.stream import StreamAudioEnded
 
 import config
-from ShrutixMusic import LOGGER, YouTube, nand
-from ShrutixMusic.misc import db
+from ShrutixMusic import LOGGER, SoundCloud, YouTube, nand, userbot
+from ShrutixMusic.core.assistants import registry
+from ShrutixMusic.core.cache import playbackcache
+from ShrutixMusic.core.userbot import assistants
+from ShrutixMusic.misc import ChatQueue, db
 from ShrutixMusic.utils.database import (
     add_active_chat,
     add_active_video_chat,
+    get_assistant_number,
+    get_call_assistant,
     get_lang,
     get_loop,
+    get_played,
     group_assistant,
     is_autoend,
+    music_off,
     music_on,
     remove_active_chat,
     remove_active_video_chat,
     set_loop,
+    set_played,
 )
 from ShrutixMusic.utils.exceptions import AssistantErr
-from ShrutixMusic.utils.formatters import check_duration, seconds_to_min, speed_converter
+from ShrutixMusic.utils.formatters import (
+    check_duration,
+    seconds_to_min,
+    time_to_seconds,
+)
 from ShrutixMusic.utils.inline.play import stream_markup
-from ShrutixMusic.utils.stream.autoclear import auto_clean
+from ShrutixMusic.utils.photos import send_photo
+from ShrutixMusic.utils.stream.autoclear import auto_clean, reset_speed
+from ShrutixMusic.utils.stream.playlist import clear_cursors, cursors, expand
+from ShrutixMusic.utils.stream.queue import attach_file
+from ShrutixMusic.utils.stream.transcode import release_transcoded, transcoded
 from ShrutixMusic.utils.thumbnails import get_thumb
 from strings import get_string
 
 autoend = {}
 counter = {}
+rendering = {}
 
 
 async def _clear_(chat_id):
-    db[chat_id] = []
+    for popped in db.get(chat_id) or []:
+        await auto_clean(popped)
+    db[chat_id] = ChatQueue()
+    clear_cursors(chat_id)
+    release_transcoded(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
 
 
 class Call(PyTgCalls):
     def __init__(self):
-        self.userbot1 = Client(
-            name="ShrutiXAss1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-        )
-        self.one = PyTgCalls(
-            self.userbot1,
-            cache_duration=100,
-        )
-        self.userbot2 = Client(
-            name="ShrutiXAss2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-        )
-        self.two = PyTgCalls(
-            self.userbot2,
-            cache_duration=100,
-        )
-        self.userbot3 = Client(
-            name="ShrutiXAss3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-        )
-        self.three = PyTgCalls(
-            self.userbot3,
-            cache_duration=100,
-        )
-        self.userbot4 = Client(
-            name="ShrutiXAss4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-        )
-        self.four = PyTgCalls(
-            self.userbot4,
-            cache_duration=100,
-        )
-        self.userbot5 = Client(
-            name="ShrutiXAss5",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
-        )
-        self.five = PyTgCalls(
-            self.userbot5,
-            cache_duration=100,
-        )
+        self.calls = [
+            PyTgCalls(
+                client,
+                cache_duration=100,
+            )
+            for client in userbot.clients
+        ]
+        for number, calls in enumerate(self.calls, start=1):
+            registry.add_calls(number, calls)
 
     async def pause_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.pause_stream(chat_id)
+        await music_off(chat_id)
 
     async def resume_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.resume_stream(chat_id)
+        await music_on(chat_id)
 
     async def stop_stream(self, chat_id: int):
+        SoundCloud.cancel(chat_id)
         assistant = await group_assistant(self, chat_id)
         try:
             await _clear_(chat_id)
@@ -118,112 +101,125 @@ class Call(PyTgCalls):
             pass
 
     async def stop_stream_force(self, chat_id: int):
-        try:
-            if config.STRING1:
-                await self.one.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING2:
-                await self.two.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING3:
-                await self.three.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING4:
-                await self.four.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING5:
-                await self.five.leave_group_call(chat_id)
-        except:
-            pass
+        SoundCloud.cancel(chat_id)
+        assistant = await get_call_assistant(chat_id)
+        if assistant:
+            try:
+                await registry.calls(assistant).leave_group_call(chat_id)
+            except:
+                pass
         try:
             await _clear_(chat_id)
         except:
             pass
 
+    async def render_speed(self, file_path, speed):
+        out = os.path.join(
+            playbackcache.path, f"{speed}_{os.path.basename(file_path)}"
+        )
+        if os.path.isfile(out):
+            return out
+        task = rendering.get(out)
+        if not task:
+            task = asyncio.ensure_future(self._render_speed(file_path, speed, out))
+            rendering[out] = task
+            task.add_done_callback(lambda _: rendering.pop(out, None))
+        return await asyncio.shield(task)
+
+    async def _render_speed(self, file_path, speed, out):
+        if not os.path.isdir(playbackcache.path):
+            os.makedirs(playbackcache.path)
+        temp = f"{out}.part"
+        ext = os.path.splitext(out)[1].lstrip(".").lower()
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-y",
+            "-i",
+            file_path,
+            "-filter:v",
+            f"setpts={round(1 / float(speed), 3)}*PTS",
+            "-filter:a",
+            f"atempo={speed}",
+            "-f",
+            {"mkv": "matroska", "m4a": "mp4"}.get(ext, ext or "mp4"),
+            temp,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        await proc.wait()
+        if proc.returncode != 0:
+            try:
+                os.remove(temp)
+            except:
+                pass
+            raise AssistantErr("Failed to render playback speed.")
+        os.replace(temp, out)
+        return out
+
     async def speedup_stream(self, chat_id: int, file_path, speed, playing):
         assistant = await group_assistant(self, chat_id)
-        if str(speed) != str("1.0"):
-            base = os.path.basename(file_path)
-            chatdir = os.path.join(os.getcwd(), "playback", str(speed))
-            if not os.path.isdir(chatdir):
-                os.makedirs(chatdir)
-            out = os.path.join(chatdir, base)
-            if not os.path.isfile(out):
-                if str(speed) == str("0.5"):
-                    vs = 2.0
-                if str(speed) == str("0.75"):
-                    vs = 1.35
-                if str(speed) == str("1.5"):
-                    vs = 0.68
-                if str(speed) == str("2.0"):
-                    vs = 0.5
-                proc = await asyncio.create_subprocess_shell(
-                    cmd=(
-                        "ffmpeg "
-                        "-i "
-                        f"{file_path} "
-                        "-filter:v "
-                        f"setpts={vs}*PTS "
-                        "-filter:a "
-                        f"atempo={speed} "
-                        f"{out}"
-                    ),
-                    stdin=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                await proc.communicate()
-            else:
-                pass
-        else:
-            out = file_path
-        dur = await asyncio.get_event_loop().run_in_executor(None, check_duration, out)
-        dur = int(dur)
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
-        duration = seconds_to_min(dur)
-        stream = (
-            AudioVideoPiped(
+        entry = playing[0]
+        played = await get_played(chat_id)
+        if entry.get("speed_path"):
+            played = int(played * float(entry.get("speed") or 1.0))
+        duration = entry.get("old_dur") or entry["dur"]
+        if entry["streamtype"] == "video" and str(speed) != str("1.0"):
+            out = await self.render_speed(file_path, speed)
+            dur = int(await check_duration(out))
+            played = int(played / float(speed))
+            stream = AudioVideoPiped(
                 out,
                 audio_parameters=HighQualityAudio(),
                 video_parameters=MediumQualityVideo(),
-                additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
+                additional_ffmpeg_parameters=f"-ss {played} -to {seconds_to_min(dur)}",
             )
-            if playing[0]["streamtype"] == "video"
-            else AudioPiped(
-                out,
-                audio_parameters=HighQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
+        else:
+            out = file_path
+            params = f"-ss {played} -to {duration}"
+            if str(speed) != str("1.0"):
+                params += f" -atmid -filter:a atempo={speed}"
+            stream = (
+                AudioVideoPiped(
+                    out,
+                    audio_parameters=HighQualityAudio(),
+                    video_parameters=MediumQualityVideo(),
+                    additional_ffmpeg_parameters=params,
+                )
+                if entry["streamtype"] == "video"
+                else AudioPiped(
+                    transcoded(out, chat_id, False),
+                    audio_parameters=HighQualityAudio(),
+                    additional_ffmpeg_parameters=params,
+                )
             )
-        )
         if str(db[chat_id][0]["file"]) == str(file_path):
             await assistant.change_stream(chat_id, stream)
         else:
             raise AssistantErr("Umm")
         if str(db[chat_id][0]["file"]) == str(file_path):
-            exis = (playing[0]).get("old_dur")
-            if not exis:
-                db[chat_id][0]["old_dur"] = db[chat_id][0]["dur"]
-                db[chat_id][0]["old_second"] = db[chat_id][0]["seconds"]
-            db[chat_id][0]["played"] = con_seconds
-            db[chat_id][0]["dur"] = duration
-            db[chat_id][0]["seconds"] = dur
-            db[chat_id][0]["speed_path"] = out
-            db[chat_id][0]["speed"] = speed
+            await reset_speed(entry)
+            if out != file_path:
+                playbackcache.acquire(out)
+                entry["old_dur"] = entry["dur"]
+                entry["old_second"] = entry["seconds"]
+                entry["dur"] = seconds_to_min(dur)
+                entry["seconds"] = dur
+                entry["speed_path"] = out
+                await set_played(chat_id, played)
+            else:
+                await set_played(chat_id, played, float(speed))
+            entry["speed"] = speed
 
     async def force_stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         try:
             check = db.get(chat_id)
-            check.pop(0)
+            popped = check.popleft()
+            await auto_clean(popped)
         except:
             pass
+        release_transcoded(chat_id)
         await remove_active_video_chat(chat_id)
         await remove_active_chat(chat_id)
         try:
@@ -246,29 +242,40 @@ class Call(PyTgCalls):
                 video_parameters=MediumQualityVideo(),
             )
         else:
-            stream = AudioPiped(link, audio_parameters=HighQualityAudio())
+            stream = AudioPiped(
+                transcoded(link, chat_id), audio_parameters=HighQualityAudio()
+            )
         await assistant.change_stream(
             chat_id,
             stream,
         )
+        await set_played(chat_id)
 
     async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
         assistant = await group_assistant(self, chat_id)
+        entry = db[chat_id][0]
+        speed = 1.0
+        params = f"-ss {to_seek} -to {duration}"
+        if mode != "video" and not entry.get("speed_path") and entry.get("speed"):
+            speed = float(entry["speed"])
+            if speed != 1.0:
+                params += f" -atmid -filter:a atempo={entry['speed']}"
         stream = (
             AudioVideoPiped(
                 file_path,
                 audio_parameters=HighQualityAudio(),
                 video_parameters=MediumQualityVideo(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                additional_ffmpeg_parameters=params,
             )
             if mode == "video"
             else AudioPiped(
-                file_path,
+                transcoded(file_path, chat_id, False),
                 audio_parameters=HighQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                additional_ffmpeg_parameters=params,
             )
         )
         await assistant.change_stream(chat_id, stream)
+        await set_played(chat_id, time_to_seconds(to_seek), speed)
 
     async def stream_call(self, link):
         assistant = await group_assistant(self, config.LOGGER_ID)
@@ -305,7 +312,9 @@ class Call(PyTgCalls):
                     video_parameters=MediumQualityVideo(),
                 )
                 if video
-                else AudioPiped(link, audio_parameters=HighQualityAudio())
+                else AudioPiped(
+                    transcoded(link, chat_id), audio_parameters=HighQualityAudio()
+                )
             )
         try:
             await assistant.join_group_call(
@@ -318,9 +327,17 @@ class Call(PyTgCalls):
         except AlreadyJoinedError:
             raise AssistantErr(_["call_9"])
         except TelegramServerError:
+            registry.error(await get_assistant_number(chat_id))
             raise AssistantErr(_["call_10"])
+        except FloodWait as e:
+            registry.error(await get_assistant_number(chat_id), flood=e.value)
+            raise
+        except Exception:
+            registry.error(await get_assistant_number(chat_id))
+            raise
         await add_active_chat(chat_id)
         await music_on(chat_id)
+        await set_played(chat_id)
         if video:
             await add_active_video_chat(chat_id)
         if await is_autoend():
@@ -335,11 +352,13 @@ class Call(PyTgCalls):
         loop = await get_loop(chat_id)
         try:
             if loop == 0:
-                popped = check.pop(0)
+                popped = check.popleft()
             else:
                 loop = loop - 1
                 await set_loop(chat_id, loop)
             await auto_clean(popped)
+            if not check and chat_id in cursors:
+                await expand(chat_id)
             if not check:
                 await _clear_(chat_id)
                 return await client.leave_group_call(chat_id)
@@ -358,13 +377,7 @@ class Call(PyTgCalls):
             original_chat_id = check[0]["chat_id"]
             streamtype = check[0]["streamtype"]
             videoid = check[0]["vidid"]
-            db[chat_id][0]["played"] = 0
-            exis = (check[0]).get("old_dur")
-            if exis:
-                db[chat_id][0]["dur"] = exis
-                db[chat_id][0]["seconds"] = check[0]["old_second"]
-                db[chat_id][0]["speed_path"] = None
-                db[chat_id][0]["speed"] = 1.0
+            await reset_speed(check[0])
             video = True if str(streamtype) == "video" else False
             if "live_" in queued:
                 n, link = await YouTube.video(videoid, True)
@@ -391,9 +404,11 @@ class Call(PyTgCalls):
                         original_chat_id,
                         text=_["call_6"],
                     )
+                await set_played(chat_id)
                 img = await get_thumb(videoid)
                 button = stream_markup(_, chat_id)
-                run = await nand.send_photo(
+                run = await send_photo(
+                    nand.send_photo,
                     chat_id=original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
@@ -407,6 +422,7 @@ class Call(PyTgCalls):
                 db[chat_id][0]["mystic"] = run
                 db[chat_id][0]["markup"] = "tg"
             elif "vid_" in queued:
+                entry = check[0]
                 mystic = await nand.send_message(original_chat_id, _["call_7"])
                 try:
                     file_path, direct = await YouTube.download(
@@ -419,6 +435,8 @@ class Call(PyTgCalls):
                     return await mystic.edit_text(
                         _["call_6"], disable_web_page_preview=True
                     )
+                if direct:
+                    attach_file(chat_id, entry, file_path)
                 if video:
                     stream = AudioVideoPiped(
                         file_path,
@@ -427,7 +445,7 @@ class Call(PyTgCalls):
                     )
                 else:
                     stream = AudioPiped(
-                        file_path,
+                        transcoded(file_path, chat_id),
                         audio_parameters=HighQualityAudio(),
                     )
                 try:
@@ -437,10 +455,12 @@ class Call(PyTgCalls):
                         original_chat_id,
                         text=_["call_6"],
                     )
+                await set_played(chat_id)
                 img = await get_thumb(videoid)
                 button = stream_markup(_, chat_id)
                 await mystic.delete()
-                run = await nand.send_photo(
+                run = await send_photo(
+                    nand.send_photo,
                     chat_id=original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
@@ -470,8 +490,10 @@ class Call(PyTgCalls):
                         original_chat_id,
                         text=_["call_6"],
                     )
+                await set_played(chat_id)
                 button = stream_markup(_, chat_id)
-                run = await nand.send_photo(
+                run = await send_photo(
+                    nand.send_photo,
                     chat_id=original_chat_id,
                     photo=config.STREAM_IMG_URL,
                     caption=_["stream_2"].format(user),
@@ -488,7 +510,7 @@ class Call(PyTgCalls):
                     )
                 else:
                     stream = AudioPiped(
-                        queued,
+                        transcoded(queued, chat_id),
                         audio_parameters=HighQualityAudio(),
                     )
                 try:
@@ -498,9 +520,11 @@ class Call(PyTgCalls):
                         original_chat_id,
                         text=_["call_6"],
                     )
+                await set_played(chat_id)
                 if videoid == "telegram":
                     button = stream_markup(_, chat_id)
-                    run = await nand.send_photo(
+                    run = await send_photo(
+                        nand.send_photo,
                         chat_id=original_chat_id,
                         photo=config.TELEGRAM_AUDIO_URL
                         if str(streamtype) == "audio"
@@ -514,7 +538,8 @@ class Call(PyTgCalls):
                     db[chat_id][0]["markup"] = "tg"
                 elif videoid == "soundcloud":
                     button = stream_markup(_, chat_id)
-                    run = await nand.send_photo(
+                    run = await send_photo(
+                        nand.send_photo,
                         chat_id=original_chat_id,
                         photo=config.SOUNCLOUD_IMG_URL,
                         caption=_["stream_1"].format(
@@ -527,7 +552,8 @@ class Call(PyTgCalls):
                 else:
                     img = await get_thumb(videoid)
                     button = stream_markup(_, chat_id)
-                    run = await nand.send_photo(
+                    run = await send_photo(
+                        nand.send_photo,
                         chat_id=original_chat_id,
                         photo=img,
                         caption=_["stream_1"].format(
@@ -542,60 +568,47 @@ class Call(PyTgCalls):
                     db[chat_id][0]["markup"] = "stream"
 
     async def ping(self):
-        pings = []
-        if config.STRING1:
-            pings.append(await self.one.ping)
-        if config.STRING2:
-            pings.append(await self.two.ping)
-        if config.STRING3:
-            pings.append(await self.three.ping)
-        if config.STRING4:
-            pings.append(await self.four.ping)
-        if config.STRING5:
-            pings.append(await self.five.ping)
+        async def ping(number):
+            ping = await registry.calls(number).ping
+            registry.set_ping(number, ping)
+            return ping
+
+        results = await asyncio.gather(
+            *[ping(number) for number in assistants], return_exceptions=True
+        )
+        pings = [x for x in results if not isinstance(x, Exception)]
+        if not pings:
+            return "N/A"
         return str(round(sum(pings) / len(pings), 3))
 
     async def start(self):
         LOGGER(__name__).info("Starting PyTgCalls Client...\n")
-        if config.STRING1:
-            await self.one.start()
-        if config.STRING2:
-            await self.two.start()
-        if config.STRING3:
-            await self.three.start()
-        if config.STRING4:
-            await self.four.start()
-        if config.STRING5:
-            await self.five.start()
+        results = await asyncio.gather(
+            *[registry.calls(number).start() for number in assistants],
+            return_exceptions=True,
+        )
+        for number, result in zip(list(assistants), results):
+            if isinstance(result, Exception):
+                LOGGER(__name__).error(
+                    f"Failed to start PyTgCalls of Assistant {number}: {type(result).__name__}: {result}"
+                )
+                assistants.remove(number)
+                registry.remove(number)
 
     async def decorators(self):
-        @self.one.on_kicked()
-        @self.two.on_kicked()
-        @self.three.on_kicked()
-        @self.four.on_kicked()
-        @self.five.on_kicked()
-        @self.one.on_closed_voice_chat()
-        @self.two.on_closed_voice_chat()
-        @self.three.on_closed_voice_chat()
-        @self.four.on_closed_voice_chat()
-        @self.five.on_closed_voice_chat()
-        @self.one.on_left()
-        @self.two.on_left()
-        @self.three.on_left()
-        @self.four.on_left()
-        @self.five.on_left()
         async def stream_services_handler(_, chat_id: int):
             await self.stop_stream(chat_id)
 
-        @self.one.on_stream_end()
-        @self.two.on_stream_end()
-        @self.three.on_stream_end()
-        @self.four.on_stream_end()
-        @self.five.on_stream_end()
         async def stream_end_handler1(client, update: Update):
             if not isinstance(update, StreamAudioEnded):
                 return
             await self.change_stream(client, update.chat_id)
 
+        for calls in self.calls:
+            calls.on_kicked()(stream_services_handler)
+            calls.on_closed_voice_chat()(stream_services_handler)
+            calls.on_left()(stream_services_handler)
+            calls.on_stream_end()(stream_end_handler1)
+
 
 Shruti = Call()
@@ -0,0 +1,124 @@
+import os
+import random
+import time
+
+from ..logging import LOGGER
+
+BOT_CHECK = ("not a bot", "http error 429")
+AUTH_ERRORS = (
+    "cookie",
+    "http error 401",
+    "http error 403",
+    "login required",
+    "log in",
+    "authenticat",
+)
+
+
+class Cookie:
+    __slots__ = ("path", "mtime", "hits", "errors", "blocks", "streak", "cooldown")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = None
+        self.hits = 0
+        self.errors = 0
+        self.blocks = 0
+        self.streak = 0
+        self.cooldown = 0
+
+
+class CookiePool:
+    def __init__(self, folder: str = "cookies", cooldown: int = 300, interval: int = 30):
+        self.folder = folder
+        self.cooldown = cooldown
+        self.interval = interval
+        self.cookies = {}
+        self.checked = 0
+
+    def reload(self):
+        now = time.monotonic()
+        if self.cookies and now < self.checked + self.interval:
+            return
+        self.checked = now
+        try:
+            names = sorted(x for x in os.listdir(self.folder) if x.endswith(".txt"))
+        except OSError:
+            names = []
+        found = {}
+        changed = False
+        for name in names:
+            path = f"{self.folder}/{name}"
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            cookie = self.cookies.get(path)
+            if not cookie:
+                cookie = Cookie(path)
+                changed = True
+            elif cookie.mtime != mtime:
+                cookie.streak = 0
+                cookie.cooldown = 0
+                changed = True
+            cookie.mtime = mtime
+            found[path] = cookie
+        changed = changed or len(found) != len(self.cookies)
+        self.cookies = found
+        if changed:
+            LOGGER(__name__).info(f"Loaded {len(self.cookies)} cookie files.")
+
+    def pick(self) -> str:
+        self.reload()
+        if not self.cookies:
+            raise FileNotFoundError("No .txt files found in the specified folder.")
+        now = time.monotonic()
+        healthy = [x for x in self.cookies.values() if x.cooldown <= now]
+        if not healthy:
+            return min(self.cookies.values(), key=lambda x: x.cooldown).path
+        least = min(x.streak for x in healthy)
+        return random.choice([x for x in healthy if x.streak == least]).path
+
+    def stamp(self, path: str) -> tuple:
+        cookie = self.cookies.get(path)
+        return path, cookie.mtime if cookie else None
+
+    def success(self, path: str):
+        cookie = self.cookies.get(path)
+        if cookie:
+            cookie.hits += 1
+            cookie.streak = 0
+
+    def failure(self, path: str, error):
+        cookie = self.cookies.get(path)
+        if not cookie:
+            return
+        message = str(error).lower()
+        if any(x in message for x in BOT_CHECK):
+            cookie.blocks += 1
+            cookie.cooldown = time.monotonic() + self.cooldown * 4
+            LOGGER(__name__).warning(f"Cookie {path} hit a bot check, cooling down.")
+            return
+        if not any(x in message for x in AUTH_ERRORS):
+            return
+        cookie.errors += 1
+        cookie.streak += 1
+        if cookie.streak >= 3:
+            cookie.cooldown = time.monotonic() + self.cooldown
+
+    def load(self) -> list:
+        self.reload()
+        now = time.monotonic()
+        return [
+            (
+                os.path.basename(x.path),
+                x.hits,
+                x.errors,
+                x.blocks,
+                x.cooldown <= now,
+            )
+            for x in self.cookies.values()
+        ]
+
+
+cookies = CookiePool()
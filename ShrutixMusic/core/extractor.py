@@ -0,0 +1,204 @@
+import asyncio
+import copy
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import yt_dlp
+
+import config
+
+from ..logging import LOGGER
+
+BASE = {
+    "geo_bypass": True,
+    "nocheckcertificate": True,
+    "quiet": True,
+    "no_warnings": True,
+}
+OPTIONS = {
+    "info": {},
+    "url": {"format": "18/best"},
+    "playlist": {"extract_flat": "in_playlist", "ignoreerrors": True},
+    "audio": {
+        "format": "bestaudio/best",
+        "outtmpl": "downloads/%(id)s.%(ext)s",
+    },
+    "video": {
+        "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
+        "outtmpl": "downloads/%(id)s.%(ext)s",
+    },
+    "songvideo": {"prefer_ffmpeg": True, "merge_output_format": "mp4"},
+    "songaudio": {
+        "prefer_ffmpeg": True,
+        "postprocessors": [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "mp3",
+                "preferredquality": "192",
+            }
+        ],
+    },
+    "soundcloud": {
+        "format": "best",
+        "outtmpl": "downloads/%(id)s.%(ext)s",
+        "retries": 3,
+        "continuedl": True,
+    },
+}
+
+_instances = {}
+
+
+def _ydl(kind, cookie):
+    key = (kind, cookie)
+    ydl = _instances.get(key)
+    if ydl is None:
+        cookiefile = cookie[0] if cookie else None
+        for stale in [
+            x for x in _instances if x[0] == kind and x[1] and x[1][0] == cookiefile
+        ]:
+            _instances.pop(stale)
+        ydl = yt_dlp.YoutubeDL({**BASE, **OPTIONS[kind], "cookiefile": cookiefile})
+        _instances[key] = ydl
+    return ydl
+
+
+def _warm():
+    yt_dlp.YoutubeDL(BASE).get_info_extractor("Youtube")
+
+
+def _ping():
+    return os.getpid()
+
+
+def _info(link, cookie, kind="info"):
+    ydl = _ydl(kind, cookie)
+    return ydl.sanitize_info(ydl.extract_info(link, download=False))
+
+
+def _stream_url(info):
+    if info.get("requested_formats"):
+        return info["requested_formats"][0]["url"]
+    return info["url"]
+
+
+def _url(link, cookie):
+    return _stream_url(_ydl("url", cookie).extract_info(link, download=False))
+
+
+def _playlist(link, cookie, start, end):
+    ydl = _ydl("playlist", cookie)
+    ydl.params["playlist_items"] = f"{start}-{end}"
+    info = ydl.extract_info(link, download=False)
+    if not info:
+        return []
+    return [x.get("id") if x else None for x in info.get("entries") or []]
+
+
+def _fetch(ydl, info, max_size=None):
+    path = os.path.join("downloads", f"{info['id']}.{info['ext']}")
+    if os.path.exists(path):
+        return path, 0
+    sizes = [
+        x.get("filesize") or x.get("filesize_approx")
+        for x in info.get("requested_formats") or [info]
+    ]
+    size = sum(x or 0 for x in sizes)
+    if max_size and (not all(sizes) or size > max_size):
+        return None, size
+    ydl.process_ie_result(info, download=True)
+    return path, size
+
+
+def _download(link, cookie, kind, max_size=None):
+    ydl = _ydl(kind, cookie)
+    return _fetch(ydl, ydl.extract_info(link, download=False), max_size)
+
+
+def _video(link, cookie, max_size=None):
+    info = _ydl("url", cookie).extract_info(link, download=False, process=False)
+    try:
+        result = _ydl("url", cookie).process_ie_result(
+            copy.deepcopy(info), download=False
+        )
+        return _stream_url(result), False, 0
+    except yt_dlp.utils.YoutubeDLError:
+        pass
+    ydl = _ydl("video", cookie)
+    path, size = _fetch(ydl, ydl.process_ie_result(info, download=False), max_size)
+    return path, True, size
+
+
+def _song(link, cookie, kind, format_id, outtmpl):
+    options = {**BASE, **OPTIONS[kind], "cookiefile": cookie[0] if cookie else None}
+    options.update(format=format_id, outtmpl=outtmpl)
+    yt_dlp.YoutubeDL(options).download([link])
+
+
+class ExtractorPool:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = None
+        self.generation = 0
+        self.restarting = None
+
+    def start(self):
+        if self.executor:
+            return
+        self.executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_warm,
+        )
+        self.generation += 1
+        for _ in range(self.workers):
+            self.executor.submit(_ping)
+        LOGGER(__name__).info(f"Started {self.workers} yt-dlp workers.")
+
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def restart(self, generation: int):
+        if self.restarting is None:
+            self.restarting = asyncio.Lock()
+        async with self.restarting:
+            if generation != self.generation:
+                return
+            LOGGER(__name__).warning("yt-dlp worker pool broke, restarting...")
+            self.stop()
+            self.start()
+
+    async def run(self, func, *args):
+        self.start()
+        loop = asyncio.get_running_loop()
+        generation = self.generation
+        try:
+            return await loop.run_in_executor(self.executor, func, *args)
+        except BrokenProcessPool:
+            await self.restart(generation)
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def info(self, link, cookie, kind="info"):
+        return await self.run(_info, link, cookie, kind)
+
+    async def url(self, link, cookie):
+        return await self.run(_url, link, cookie)
+
+    async def playlist(self, link, cookie, start, end):
+        return await self.run(_playlist, link, cookie, start, end)
+
+    async def download(self, link, cookie, kind, max_size=None):
+        return await self.run(_download, link, cookie, kind, max_size)
+
+    async def video(self, link, cookie, max_size=None):
+        return await self.run(_video, link, cookie, max_size)
+
+    async def song(self, link, cookie, kind, format_id, outtmpl):
+        return await self.run(_song, link, cookie, kind, format_id, outtmpl)
+
+
+extractor = ExtractorPool(config.YTDLP_WORKERS)
@@ -0,0 +1,82 @@
+import asyncio
+
+import aiohttp
+
+from ..logging import LOGGER
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class HTTPClient:
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        timeout: int = 30,
+        retries: int = 2,
+        backoff: float = 0.5,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def start(self):
+        self.get_session()
+        LOGGER(__name__).info("Started shared HTTP client.")
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def read(self, resp, mode: str):
+        if mode == "bytes":
+            return await resp.read()
+        if mode == "json":
+            try:
+                return await resp.json(content_type=None)
+            except Exception:
+                return await resp.text()
+        return await resp.text()
+
+    async def fetch(self, method: str, url: str, mode: str = "text", **kwargs):
+        retryable = (
+            (aiohttp.ClientError, asyncio.TimeoutError)
+            if method == "GET"
+            else aiohttp.ClientConnectorError
+        )
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                async with self.get_session().request(method, url, **kwargs) as resp:
+                    if last or method != "GET" or resp.status not in RETRY_STATUS:
+                        return resp.status, await self.read(resp, mode)
+            except retryable:
+                if last:
+                    raise
+            await asyncio.sleep(self.backoff * 2**attempt)
+
+    async def get(self, url: str, mode: str = "text", **kwargs):
+        return await self.fetch("GET", url, mode, **kwargs)
+
+    async def post(self, url: str, mode: str = "json", **kwargs):
+        return await self.fetch("POST", url, mode, **kwargs)
+
+
+http = HTTPClient()
@@ -1,5 +1,7 @@
+import random
 import socket
 import time
+from collections import deque
 
 import heroku3
 from pyrogram import filters
@@ -36,6 +38,60 @@ XCB = [
 ]
 
 
+class QueueEntry:
+    __slots__ = (
+        "title",
+        "dur",
+        "streamtype",
+        "by",
+        "user_id",
+        "chat_id",
+        "file",
+        "vidid",
+        "seconds",
+        "mystic",
+        "markup",
+        "old_dur",
+        "old_second",
+        "speed_path",
+        "speed",
+    )
+
+    def __init__(self, **kwargs):
+        for key in self.__slots__:
+            setattr(self, key, None)
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "mystic":
+            value = getattr(value, "id", value)
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+
+class ChatQueue(deque):
+    def shuffle(self):
+        current = self.popleft()
+        rest = list(self)
+        random.shuffle(rest)
+        self.clear()
+        self.append(current)
+        self.extend(rest)
+
+
 def dbb():
     global db
     db = {}
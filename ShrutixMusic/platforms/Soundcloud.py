@@ -1,18 +1,28 @@
+import asyncio
+import threading
 from os import path
 
+from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadCancelled
 
+import config
+from ShrutixMusic.core.cache import TTLCache, downloadcache
+from ShrutixMusic.core.extractor import OPTIONS, extractor
 from ShrutixMusic.utils.formatters import seconds_to_min
 
+downloading = {}
+callers = {}
+waiting = {}
+tracks = TTLCache(1024, 86400)
+
 
 class SoundAPI:
     def __init__(self):
         self.opts = {
-            "outtmpl": "downloads/%(id)s.%(ext)s",
-            "format": "best",
-            "retries": 3,
-            "nooverwrites": False,
-            "continuedl": True,
+            **OPTIONS["soundcloud"],
+            "quiet": True,
+            "no_warnings": True,
         }
 
     async def valid(self, link: str):
@@ -21,13 +31,87 @@ class SoundAPI:
         else:
             return False
 
-    async def download(self, url):
-        d = YoutubeDL(self.opts)
+    def fetch(self, info, cancel: threading.Event):
+        def hook(_):
+            if cancel.is_set():
+                raise DownloadCancelled()
+
+        YoutubeDL({**self.opts, "progress_hooks": [hook]}).process_ie_result(
+            info, download=True
+        )
+
+    async def download(self, url, mystic=None, chat_id=None):
+        cached = tracks.get(url)
+        if cached and path.exists(cached[1]):
+            downloadcache.touch(cached[1])
+            return cached
+        task = downloading.get(url)
+        if not task:
+            task = asyncio.ensure_future(self._download(url))
+            downloading[url] = task
+
+            def done(_):
+                if downloading.get(url) is task:
+                    downloading.pop(url)
+
+            task.add_done_callback(done)
+        callers[task] = callers.get(task, 0) + 1
+        waiter = asyncio.ensure_future(asyncio.shield(task))
+        if chat_id is not None:
+            waiting.setdefault(chat_id, set()).add(waiter)
+        if mystic:
+            config.lyrical[mystic.id] = waiter
+        try:
+            if mystic:
+                try:
+                    await mystic.edit_reply_markup(
+                        InlineKeyboardMarkup(
+                            [
+                                [
+                                    InlineKeyboardButton(
+                                        text="ᴄᴀɴᴄᴇʟ",
+                                        callback_data="stop_downloading",
+                                    ),
+                                ]
+                            ]
+                        )
+                    )
+                except:
+                    pass
+            return await waiter
+        finally:
+            if mystic:
+                config.lyrical.pop(mystic.id, None)
+            if chat_id is not None:
+                waiting.get(chat_id, set()).discard(waiter)
+                if not waiting.get(chat_id):
+                    waiting.pop(chat_id, None)
+            count = callers.pop(task) - 1
+            if count:
+                callers[task] = count
+            elif not task.done():
+                task.cancel()
+
+    def cancel(self, chat_id):
+        for waiter in waiting.pop(chat_id, ()):
+            waiter.cancel()
+
+    async def _download(self, url):
         try:
-            info = d.extract_info(url)
+            info = await extractor.info(url, None, "soundcloud")
         except:
             return False
         xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
+        if not path.exists(xyz):
+            cancel = threading.Event()
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self.fetch, info, cancel)
+            except asyncio.CancelledError:
+                cancel.set()
+                raise
+            except:
+                return False
         duration_min = seconds_to_min(info["duration"])
         track_details = {
             "title": info["title"],
@@ -36,4 +120,5 @@ class SoundAPI:
             "uploader": info["uploader"],
             "filepath": xyz,
         }
+        tracks.set(url, (track_details, xyz))
         return track_details, xyz
@@ -1,10 +1,17 @@
+import asyncio
 import re
+from functools import partial
 
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 from youtubesearchpython.__future__ import VideosSearch
 
 import config
+from ShrutixMusic.core.cache import TTLCache
+from ShrutixMusic.utils.database import get_spotify_matches, save_spotify_match
+
+pages = TTLCache(512, 3600)
+queries = TTLCache(10000, 3600)
 
 
 class SpotifyAPI:
@@ -28,13 +35,69 @@ class SpotifyAPI:
         else:
             return False
 
-    async def track(self, link: str):
-        track = self.spotify.track(link)
+    async def call(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(method, *args, **kwargs))
+
+    def query(self, track) -> str:
         info = track["name"]
         for artist in track["artists"]:
             fetched = f' {artist["name"]}'
             if "Various Artists" not in fetched:
                 info += fetched
+        return info
+
+    async def items(self, tracks) -> list:
+        ids = [x["id"] for x in tracks if x and x.get("id")]
+        matches = await get_spotify_matches(ids) if ids else {}
+        results = []
+        for track in tracks:
+            if not track:
+                results.append(None)
+                continue
+            vidid = matches.get(track.get("id"))
+            if vidid:
+                results.append(f"https://www.youtube.com/watch?v={vidid}")
+                continue
+            info = self.query(track)
+            if track.get("id"):
+                queries.set(info, track["id"])
+            results.append(info)
+        return results
+
+    async def remember(self, query: str, vidid: str):
+        track_id = queries.pop(query)
+        if track_id:
+            try:
+                await save_spotify_match(track_id, vidid)
+            except:
+                pass
+
+    async def page(self, key, first, limit: int) -> list:
+        tracks = pages.get(key)
+        if tracks is None:
+            tracks = []
+            page = await first()
+            while page:
+                for item in page["items"]:
+                    tracks.append(item["track"] if "track" in item else item)
+                if len(tracks) >= limit or not page.get("next"):
+                    break
+                page = await self.call(self.spotify.next, page)
+            tracks = tracks[:limit]
+            pages.set(key, tracks)
+        return await self.items(tracks)
+
+    async def track(self, link: str):
+        match = re.search(r"track/([0-9A-Za-z]+)", link)
+        if match:
+            vidid = (await get_spotify_matches([match.group(1)])).get(match.group(1))
+            if vidid:
+                from ShrutixMusic import YouTube
+
+                return await YouTube.track(vidid, True)
+        track = await self.call(self.spotify.track, link)
+        info = self.query(track)
         results = VideosSearch(info, limit=1)
         for result in (await results.next())["result"]:
             ytlink = result["link"]
@@ -49,50 +112,58 @@ class SpotifyAPI:
             "duration_min": duration_min,
             "thumb": thumbnail,
         }
+        try:
+            await save_spotify_match(track["id"], vidid)
+        except:
+            pass
         return track_details, vidid
 
     async def playlist(self, url):
-        playlist = self.spotify.playlist(url)
+        playlist = await self.call(self.spotify.playlist, url, fields="id")
         playlist_id = playlist["id"]
-        results = []
-        for item in playlist["tracks"]["items"]:
-            music_track = item["track"]
-            info = music_track["name"]
-            for artist in music_track["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
+        results = await self.playlist_page(playlist_id, 0, config.PLAYLIST_FETCH_LIMIT)
         return results, playlist_id
 
+    async def playlist_page(self, playlist_id, offset, limit):
+        return await self.page(
+            ("playlist", playlist_id, offset, limit),
+            partial(
+                self.call,
+                self.spotify.playlist_items,
+                playlist_id,
+                offset=offset,
+                limit=min(limit, 100),
+            ),
+            limit,
+        )
+
     async def album(self, url):
-        album = self.spotify.album(url)
+        album = await self.call(self.spotify.album, url)
         album_id = album["id"]
-        results = []
-        for item in album["tracks"]["items"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
+        results = await self.album_page(album_id, 0, config.PLAYLIST_FETCH_LIMIT)
         return (
             results,
             album_id,
         )
 
+    async def album_page(self, album_id, offset, limit):
+        return await self.page(
+            ("album", album_id, offset, limit),
+            partial(
+                self.call,
+                self.spotify.album_tracks,
+                album_id,
+                limit=min(limit, 50),
+                offset=offset,
+            ),
+            limit,
+        )
+
     async def artist(self, url):
-        artistinfo = self.spotify.artist(url)
+        artistinfo, artisttoptracks = await asyncio.gather(
+            self.call(self.spotify.artist, url),
+            self.call(self.spotify.artist_top_tracks, url),
+        )
         artist_id = artistinfo["id"]
-        results = []
-        artisttoptracks = self.spotify.artist_top_tracks(url)
-        for item in artisttoptracks["tracks"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
-        return results, artist_id
+        results = await self.items(artisttoptracks["tracks"])
+        return [x for x in results if x], artist_id
@@ -13,6 +13,7 @@ from ShrutixMusic.utils.formatters import (
     get_readable_time,
     seconds_to_min,
 )
+from ShrutixMusic.utils.stream.transcode import transcode
 
 
 class TeleAPI:
@@ -54,9 +55,7 @@ class TeleAPI:
             dur = seconds_to_min(filex.duration)
         except:
             try:
-                dur = await asyncio.get_event_loop().run_in_executor(
-                    None, check_duration, file_path
-                )
+                dur = await check_duration(file_path)
                 dur = seconds_to_min(dur)
             except:
                 return "Unknown"
@@ -97,6 +96,7 @@ class TeleAPI:
         checker = [5, 10, 20, 40, 66, 80, 99]
         speed_counter = {}
         if os.path.exists(fname):
+            transcode(fname)
             return True
 
         async def down_load():
@@ -173,4 +173,6 @@ class TeleAPI:
         if not verify:
             return False
         config.lyrical.pop(mystic.id)
+        if os.path.exists(fname):
+            transcode(fname)
         return True
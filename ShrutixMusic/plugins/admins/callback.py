@@ -1,5 +1,3 @@
-import asyncio
-
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
@@ -9,6 +7,7 @@ from ShrutixMusic.misc import SUDOERS, db
 from ShrutixMusic.utils.database import (
     get_active_chats,
     get_lang,
+    get_played,
     get_upvote_count,
     is_active_chat,
     is_music_playing,
@@ -20,7 +19,10 @@ from ShrutixMusic.utils.database import (
 from ShrutixMusic.utils.decorators.language import languageCB
 from ShrutixMusic.utils.formatters import seconds_to_min
 from ShrutixMusic.utils.inline import close_markup, stream_markup, stream_markup_timer
-from ShrutixMusic.utils.stream.autoclear import auto_clean
+from ShrutixMusic.utils.photos import send_photo
+from ShrutixMusic.utils.progress import progress
+from ShrutixMusic.utils.stream.autoclear import auto_clean, reset_speed
+from ShrutixMusic.utils.stream.queue import attach_file
 from ShrutixMusic.utils.thumbnails import get_thumb
 from config import (
     BANNED_USERS,
@@ -163,7 +165,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             txt = f"➻ sᴛʀᴇᴀᴍ sᴋɪᴩᴩᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
             popped = None
             try:
-                popped = check.pop(0)
+                popped = check.popleft()
                 if popped:
                     await auto_clean(popped)
                 if not check:
@@ -204,13 +206,7 @@ async def del_back_playlist(client, CallbackQuery, _):
         streamtype = check[0]["streamtype"]
         videoid = check[0]["vidid"]
         status = True if str(streamtype) == "video" else None
-        db[chat_id][0]["played"] = 0
-        exis = (check[0]).get("old_dur")
-        if exis:
-            db[chat_id][0]["dur"] = exis
-            db[chat_id][0]["seconds"] = check[0]["old_second"]
-            db[chat_id][0]["speed_path"] = None
-            db[chat_id][0]["speed"] = 1.0
+        await reset_speed(check[0])
         if "live_" in queued:
             n, link = await YouTube.video(videoid, True)
             if n == 0:
@@ -228,7 +224,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 return await CallbackQuery.message.reply_text(_["call_6"])
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
-            run = await CallbackQuery.message.reply_photo(
+            run = await send_photo(
+                CallbackQuery.message.reply_photo,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{nand.username}?start=info_{videoid}",
@@ -242,6 +239,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             db[chat_id][0]["markup"] = "tg"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         elif "vid_" in queued:
+            entry = check[0]
             mystic = await CallbackQuery.message.reply_text(
                 _["call_7"], disable_web_page_preview=True
             )
@@ -254,6 +252,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 )
             except:
                 return await mystic.edit_text(_["call_6"])
+            if direct:
+                attach_file(chat_id, entry, file_path)
             try:
                 image = await YouTube.thumbnail(videoid, True)
             except:
@@ -264,7 +264,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 return await mystic.edit_text(_["call_6"])
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
-            run = await CallbackQuery.message.reply_photo(
+            run = await send_photo(
+                CallbackQuery.message.reply_photo,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{nand.username}?start=info_{videoid}",
@@ -284,7 +285,8 @@ async def del_back_playlist(client, CallbackQuery, _):
             except:
                 return await CallbackQuery.message.reply_text(_["call_6"])
             button = stream_markup(_, chat_id)
-            run = await CallbackQuery.message.reply_photo(
+            run = await send_photo(
+                CallbackQuery.message.reply_photo,
                 photo=STREAM_IMG_URL,
                 caption=_["stream_2"].format(user),
                 reply_markup=InlineKeyboardMarkup(button),
@@ -308,7 +310,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 return await CallbackQuery.message.reply_text(_["call_6"])
             if videoid == "telegram":
                 button = stream_markup(_, chat_id)
-                run = await CallbackQuery.message.reply_photo(
+                run = await send_photo(
+                    CallbackQuery.message.reply_photo,
                     photo=TELEGRAM_AUDIO_URL
                     if str(streamtype) == "audio"
                     else TELEGRAM_VIDEO_URL,
@@ -321,7 +324,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 db[chat_id][0]["markup"] = "tg"
             elif videoid == "soundcloud":
                 button = stream_markup(_, chat_id)
-                run = await CallbackQuery.message.reply_photo(
+                run = await send_photo(
+                    CallbackQuery.message.reply_photo,
                     photo=SOUNCLOUD_IMG_URL
                     if str(streamtype) == "audio"
                     else TELEGRAM_VIDEO_URL,
@@ -335,7 +339,8 @@ async def del_back_playlist(client, CallbackQuery, _):
             else:
                 button = stream_markup(_, chat_id)
                 img = await get_thumb(videoid)
-                run = await CallbackQuery.message.reply_photo(
+                run = await send_photo(
+                    CallbackQuery.message.reply_photo,
                     photo=img,
                     caption=_["stream_1"].format(
                         f"https://t.me/{nand.username}?start=info_{videoid}",
@@ -351,47 +356,42 @@ async def del_back_playlist(client, CallbackQuery, _):
 
 
 async def markup_timer():
-    while not await asyncio.sleep(7):
-        active_chats = await get_active_chats()
-        for chat_id in active_chats:
+    edits = []
+    active_chats = await get_active_chats()
+    for chat_id in active_chats:
+        try:
+            if not await is_music_playing(chat_id):
+                continue
+            playing = db.get(chat_id)
+            if not playing:
+                continue
+            duration_seconds = int(playing[0]["seconds"])
+            if duration_seconds == 0:
+                continue
+            mystic = playing[0]["mystic"]
+            if not mystic:
+                continue
             try:
-                if not await is_music_playing(chat_id):
-                    continue
-                playing = db.get(chat_id)
-                if not playing:
-                    continue
-                duration_seconds = int(playing[0]["seconds"])
-                if duration_seconds == 0:
-                    continue
-                try:
-                    mystic = playing[0]["mystic"]
-                except:
-                    continue
-                try:
-                    check = checker[chat_id][mystic.id]
-                    if check is False:
-                        continue
-                except:
-                    pass
-                try:
-                    language = await get_lang(chat_id)
-                    _ = get_string(language)
-                except:
-                    _ = get_string("en")
-                try:
-                    buttons = stream_markup_timer(
-                        _,
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
-                    await mystic.edit_reply_markup(
-                        reply_markup=InlineKeyboardMarkup(buttons)
-                    )
-                except:
+                check = checker[chat_id][mystic]
+                if check is False:
                     continue
             except:
-                continue
+                pass
+            try:
+                language = await get_lang(chat_id)
+                _ = get_string(language)
+            except:
+                _ = get_string("en")
+            buttons = stream_markup_timer(
+                _,
+                chat_id,
+                seconds_to_min(min(await get_played(chat_id), duration_seconds)),
+                playing[0]["dur"],
+            )
+            edits.append((playing[0]["chat_id"], mystic, InlineKeyboardMarkup(buttons)))
+        except:
+            continue
+    return edits
 
 
-asyncio.create_task(markup_timer())
+progress.add_source(markup_timer)
@@ -8,7 +8,9 @@ from ShrutixMusic.misc import db
 from ShrutixMusic.utils.database import get_loop
 from ShrutixMusic.utils.decorators import AdminRightsCheck
 from ShrutixMusic.utils.inline import close_markup, stream_markup
-from ShrutixMusic.utils.stream.autoclear import auto_clean
+from ShrutixMusic.utils.photos import send_photo
+from ShrutixMusic.utils.stream.autoclear import auto_clean, reset_speed
+from ShrutixMusic.utils.stream.queue import attach_file
 from ShrutixMusic.utils.thumbnails import get_thumb
 from config import BANNED_USERS
 
@@ -34,7 +36,7 @@ async def skip(cli, message: Message, _, chat_id):
                         for x in range(state):
                             popped = None
                             try:
-                                popped = check.pop(0)
+                                popped = check.popleft()
                             except:
                                 return await message.reply_text(_["admin_12"])
                             if popped:
@@ -64,7 +66,7 @@ async def skip(cli, message: Message, _, chat_id):
         check = db.get(chat_id)
         popped = None
         try:
-            popped = check.pop(0)
+            popped = check.popleft()
             if popped:
                 await auto_clean(popped)
             if not check:
@@ -95,13 +97,7 @@ async def skip(cli, message: Message, _, chat_id):
     streamtype = check[0]["streamtype"]
     videoid = check[0]["vidid"]
     status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
-    exis = (check[0]).get("old_dur")
-    if exis:
-        db[chat_id][0]["dur"] = exis
-        db[chat_id][0]["seconds"] = check[0]["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+    await reset_speed(check[0])
     if "live_" in queued:
         n, link = await YouTube.video(videoid, True)
         if n == 0:
@@ -116,7 +112,8 @@ async def skip(cli, message: Message, _, chat_id):
             return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
         img = await get_thumb(videoid)
-        run = await message.reply_photo(
+        run = await send_photo(
+            message.reply_photo,
             photo=img,
             caption=_["stream_1"].format(
                 f"https://t.me/{nand.username}?start=info_{videoid}",
@@ -129,6 +126,7 @@ async def skip(cli, message: Message, _, chat_id):
         db[chat_id][0]["mystic"] = run
         db[chat_id][0]["markup"] = "tg"
     elif "vid_" in queued:
+        entry = check[0]
         mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
         try:
             file_path, direct = await YouTube.download(
@@ -139,6 +137,8 @@ async def skip(cli, message: Message, _, chat_id):
             )
         except:
             return await mystic.edit_text(_["call_6"])
+        if direct:
+            attach_file(chat_id, entry, file_path)
         try:
             image = await YouTube.thumbnail(videoid, True)
         except:
@@ -149,7 +149,8 @@ async def skip(cli, message: Message, _, chat_id):
             return await mystic.edit_text(_["call_6"])
         button = stream_markup(_, chat_id)
         img = await get_thumb(videoid)
-        run = await message.reply_photo(
+        run = await send_photo(
+            message.reply_photo,
             photo=img,
             caption=_["stream_1"].format(
                 f"https://t.me/{nand.username}?start=info_{videoid}",
@@ -168,7 +169,8 @@ async def skip(cli, message: Message, _, chat_id):
         except:
             return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
-        run = await message.reply_photo(
+        run = await send_photo(
+            message.reply_photo,
             photo=config.STREAM_IMG_URL,
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(button),
@@ -191,7 +193,8 @@ async def skip(cli, message: Message, _, chat_id):
             return await message.reply_text(_["call_6"])
         if videoid == "telegram":
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await send_photo(
+                message.reply_photo,
                 photo=config.TELEGRAM_AUDIO_URL
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
@@ -204,7 +207,8 @@ async def skip(cli, message: Message, _, chat_id):
             db[chat_id][0]["markup"] = "tg"
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await send_photo(
+                message.reply_photo,
                 photo=config.SOUNCLOUD_IMG_URL
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
@@ -218,7 +222,8 @@ async def skip(cli, message: Message, _, chat_id):
         else:
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
-            run = await message.reply_photo(
+            run = await send_photo(
+                message.reply_photo,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{nand.username}?start=info_{videoid}",
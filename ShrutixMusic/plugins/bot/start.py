@@ -3,10 +3,9 @@ import time
 from pyrogram import filters
 from pyrogram.enums import ChatType
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
-from youtubesearchpython.__future__ import VideosSearch
 
 import config
-from ShrutixMusic import nand
+from ShrutixMusic import YouTube, nand
 from ShrutixMusic.misc import _boot_
 from ShrutixMusic.plugins.sudo.sudoers import sudoers_list
 from ShrutixMusic.utils.database import (
@@ -48,17 +47,15 @@ async def start_pm(client, message: Message, _):
         if name[0:3] == "inf":
             m = await message.reply_text("🔎")
             query = (str(name)).replace("info_", "", 1)
-            query = f"https://www.youtube.com/watch?v={query}"
-            results = VideosSearch(query, limit=1)
-            for result in (await results.next())["result"]:
-                title = result["title"]
-                duration = result["duration"]
-                views = result["viewCount"]["short"]
-                thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-                channellink = result["channel"]["link"]
-                channel = result["channel"]["name"]
-                link = result["link"]
-                published = result["publishedTime"]
+            meta = await YouTube.metadata(query, True)
+            title = meta["title"]
+            duration = meta["duration_min"]
+            views = meta["views"]
+            thumbnail = meta["thumbnail"]
+            channellink = meta["channellink"]
+            channel = meta["channel"]
+            link = meta["link"]
+            published = meta["published"]
             searched_text = _["start_6"].format(
                 title, duration, views, published, channellink, channel, nand.mention
             )
@@ -0,0 +1,53 @@
+import asyncio
+
+import config
+from ShrutixMusic import YouTube
+from ShrutixMusic.misc import db
+from ShrutixMusic.utils.database import get_active_chats, get_played
+from ShrutixMusic.utils.stream.playlist import cursors, expand
+from ShrutixMusic.utils.stream.queue import attach_file
+
+prefetched = {}
+
+
+async def prefetch(chat_id, track):
+    try:
+        file_path, direct = await YouTube.download(
+            track["vidid"],
+            None,
+            videoid=True,
+            video=True if str(track["streamtype"]) == "video" else False,
+        )
+    except:
+        return
+    if direct:
+        attach_file(chat_id, track, file_path)
+
+
+async def prefetcher():
+    while not await asyncio.sleep(5):
+        active_chats = await get_active_chats()
+        for chat_id in list(prefetched):
+            if chat_id not in active_chats:
+                prefetched.pop(chat_id, None)
+        for chat_id in active_chats:
+            check = db.get(chat_id)
+            if check and len(check) <= 2 and chat_id in cursors:
+                asyncio.create_task(expand(chat_id))
+            if not check or len(check) < 2:
+                prefetched.pop(chat_id, None)
+                continue
+            track = check[1]
+            if "vid_" not in track["file"]:
+                continue
+            if prefetched.get(chat_id) is track:
+                continue
+            duration = int(check[0]["seconds"])
+            played = await get_played(chat_id)
+            if duration and duration - played > config.PREFETCH_BEFORE:
+                continue
+            prefetched[chat_id] = track
+            asyncio.create_task(prefetch(chat_id, track))
+
+
+asyncio.create_task(prefetcher())
@@ -1,3 +1,4 @@
+import asyncio
 import random
 import string
 
@@ -21,6 +22,7 @@ from ShrutixMusic.utils.inline import (
     track_markup,
 )
 from ShrutixMusic.utils.logger import play_logs
+from ShrutixMusic.utils.stream.playlist import playlist_cursor
 from ShrutixMusic.utils.stream.stream import stream
 from config import BANNED_USERS, lyrical
 
@@ -258,7 +260,12 @@ async def play_commnd(
             cap = _["play_10"].format(details["title"], details["duration_min"])
         elif await SoundCloud.valid(url):
             try:
-                details, track_path = await SoundCloud.download(url)
+                details, track_path = await SoundCloud.download(url, mystic, chat_id)
+            except asyncio.CancelledError:
+                try:
+                    return await mystic.edit_text(_["tg_6"])
+                except:
+                    return
             except:
                 return await mystic.edit_text(_["play_3"])
             duration_sec = details["duration_sec"]
@@ -353,6 +360,9 @@ async def play_commnd(
                     _["play_13"],
                     reply_markup=InlineKeyboardMarkup(buttons),
                 )
+        cursor = None
+        if plist_type:
+            details, cursor = playlist_cursor(plist_type, plist_id, details)
         try:
             await stream(
                 _,
@@ -366,6 +376,7 @@ async def play_commnd(
                 streamtype=streamtype,
                 spotify=spotify,
                 forceplay=fplay,
+                cursor=cursor,
             )
         except Exception as e:
             ex_type = type(e).__name__
@@ -578,6 +589,7 @@ async def play_playlists_command(client, CallbackQuery, _):
             result, apple_id = await Apple.playlist(videoid, True)
         except:
             return await mystic.edit_text(_["play_3"])
+    result, cursor = playlist_cursor(ptype, videoid, result)
     try:
         await stream(
             _,
@@ -591,6 +603,7 @@ async def play_playlists_command(client, CallbackQuery, _):
             streamtype="playlist",
             spotify=spotify,
             forceplay=ffplay,
+            cursor=cursor,
         )
     except Exception as e:
         ex_type = type(e).__name__
@@ -11,6 +11,14 @@ from pyrogram import filters
 
 import config
 from ShrutixMusic import nand
+from ShrutixMusic.core.cache import (
+    downloadcache,
+    playbackcache,
+    thumbcache,
+    transcodecache,
+)
+from ShrutixMusic.core.extractor import extractor
+from ShrutixMusic.core.http import http
 from ShrutixMusic.misc import HAPP, SUDOERS, XCB
 from ShrutixMusic.utils.database import (
     get_active_chats,
@@ -19,6 +27,7 @@ from ShrutixMusic.utils.database import (
 )
 from ShrutixMusic.utils.decorators.language import language
 from ShrutixMusic.utils.pastebin import ShrutiBin
+from ShrutixMusic.utils.thumbnails import stop_renderer
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -126,9 +135,25 @@ async def restart_(_, message):
             pass
 
     try:
-        shutil.rmtree("downloads")
+        for entry in os.scandir("cache"):
+            if not entry.name.startswith(("carbon", "thumb")):
+                continue
+            key = thumbcache.key(entry.path)
+            if key in thumbcache.files:
+                thumbcache.remove(key)
+            else:
+                os.remove(entry.path)
+    except:
+        pass
+    downloadcache.save()
+    playbackcache.save()
+    transcodecache.save()
+    thumbcache.save()
+    extractor.stop()
+    stop_renderer()
+    await http.close()
+    try:
         shutil.rmtree("raw_files")
-        shutil.rmtree("cache")
     except:
         pass
     await response.edit_text(
@@ -2,16 +2,20 @@ import asyncio
 import os
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import CallbackQuery, InputMediaPhoto, Message
 
 import config
 from ShrutixMusic import nand
 from ShrutixMusic.misc import db
 from ShrutixMusic.utils import ShrutiBin, get_channeplayCB, seconds_to_min
-from ShrutixMusic.utils.database import get_cmode, is_active_chat, is_music_playing
+from ShrutixMusic.utils.database import (
+    get_cmode,
+    get_played,
+    is_active_chat,
+)
 from ShrutixMusic.utils.decorators.language import language, languageCB
 from ShrutixMusic.utils.inline import queue_back_markup, queue_markup
+from ShrutixMusic.utils.progress import progress
 from config import BANNED_USERS
 
 basic = {}
@@ -92,39 +96,30 @@ async def get_queue(client, message: Message, _):
             DUR,
             "c" if cplay else "g",
             videoid,
-            seconds_to_min(got[0]["played"]),
+            seconds_to_min(await get_played(chat_id)),
             got[0]["dur"],
         )
     )
     basic[videoid] = True
     mystic = await message.reply_photo(IMAGE, caption=cap, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    "c" if cplay else "g",
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+
+        async def render():
+            playing = db.get(chat_id)
+            if not playing or playing[0]["vidid"] != videoid:
+                return None
+            if not basic.get(videoid) or not await is_active_chat(chat_id):
+                return None
+            return queue_markup(
+                _,
+                DUR,
+                "c" if cplay else "g",
+                videoid,
+                seconds_to_min(await get_played(chat_id)),
+                playing[0]["dur"],
+            )
+
+        progress.subscribe(mystic, render)
 
 
 @nand.on_callback_query(filters.regex("GetTimer") & ~BANNED_USERS)
@@ -232,7 +227,7 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
             DUR,
             cplay,
             videoid,
-            seconds_to_min(got[0]["played"]),
+            seconds_to_min(await get_played(chat_id)),
             got[0]["dur"],
         )
     )
@@ -241,29 +236,20 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
     med = InputMediaPhoto(media=IMAGE, caption=cap)
     mystic = await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    cplay,
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+
+        async def render():
+            playing = db.get(chat_id)
+            if not playing or playing[0]["vidid"] != videoid:
+                return None
+            if not basic.get(videoid) or not await is_active_chat(chat_id):
+                return None
+            return queue_markup(
+                _,
+                DUR,
+                cplay,
+                videoid,
+                seconds_to_min(await get_played(chat_id)),
+                playing[0]["dur"],
+            )
+
+        progress.subscribe(mystic, render)
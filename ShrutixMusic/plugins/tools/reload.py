@@ -7,7 +7,6 @@ from pyrogram.types import CallbackQuery, Message
 
 from ShrutixMusic import nand
 from ShrutixMusic.core.call import Shruti
-from ShrutixMusic.misc import db
 from ShrutixMusic.utils.database import get_assistant, get_authuser_names, get_cmode
 from ShrutixMusic.utils.decorators import ActualAdminCB, AdminActual, language
 from ShrutixMusic.utils.formatters import alpha_to_int, get_readable_time
@@ -52,7 +51,6 @@ async def restartbot(client, message: Message, _):
     mystic = await message.reply_text(_["reload_4"].format(nand.mention))
     await asyncio.sleep(1)
     try:
-        db[message.chat.id] = []
         await Shruti.stop_stream_force(message.chat.id)
     except:
         pass
@@ -79,7 +77,6 @@ async def restartbot(client, message: Message, _):
         except:
             pass
         try:
-            db[chat_id] = []
             await Shruti.stop_stream_force(chat_id)
         except:
             pass
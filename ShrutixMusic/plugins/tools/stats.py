@@ -10,6 +10,9 @@ from pytgcalls.__version__ import __version__ as pytgver
 
 import config
 from ShrutixMusic import nand
+from ShrutixMusic.core.assistants import registry
+from ShrutixMusic.core.call import Shruti
+from ShrutixMusic.core.cookies import cookies
 from ShrutixMusic.core.userbot import assistants
 from ShrutixMusic.misc import SUDOERS, mongodb
 from ShrutixMusic.plugins import ALL_MODULES
@@ -63,6 +66,18 @@ async def overall_stats(client, CallbackQuery, _):
         config.AUTO_LEAVING_ASSISTANT,
         config.DURATION_LIMIT_MIN,
     )
+    try:
+        await Shruti.ping()
+    except:
+        pass
+    for number, calls, ping, errors, floods, healthy in registry.load():
+        text += _["gstats_6"].format(
+            number, calls, round(ping, 2), errors, floods, "✅" if healthy else "❌"
+        )
+    for name, hits, errors, blocks, healthy in cookies.load():
+        text += _["gstats_7"].format(
+            name, hits, errors, blocks, "✅" if healthy else "❌"
+        )
     med = InputMediaPhoto(media=config.STATS_IMG_URL, caption=text)
     try:
         await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
@@ -1,8 +1,12 @@
-import random
+import time
 from typing import Dict, List, Union
 
-from ShrutixMusic import userbot
+from pymongo import UpdateOne
+
+from ShrutixMusic.core.assistants import registry
+from ShrutixMusic.core.cache import TTLCache
 from ShrutixMusic.core.mongo import mongodb
+from ShrutixMusic.utils.exceptions import AssistantErr
 
 authdb = mongodb.adminauth
 authuserdb = mongodb.authuser
@@ -11,32 +15,145 @@ assdb = mongodb.assistants
 blacklist_chatdb = mongodb.blacklistChat
 blockeddb = mongodb.blockedusers
 chatsdb = mongodb.chats
+chatsettingsdb = mongodb.chatsettings
 channeldb = mongodb.cplaymode
 countdb = mongodb.upcount
+fileiddb = mongodb.fileids
 gbansdb = mongodb.gban
 langdb = mongodb.language
 onoffdb = mongodb.onoffper
 playmodedb = mongodb.playmode
 playtypedb = mongodb.playtypedb
 skipdb = mongodb.skipmode
+spotifydb = mongodb.spotify
 sudoersdb = mongodb.sudoers
 usersdb = mongodb.tgusersdb
+ytmetadb = mongodb.ytmeta
 
 # Shifting to memory [mongo sucks often]
-active = []
-activevideo = []
+active = {}
+activevideo = set()
 assistantdict = {}
 autoend = {}
-count = {}
-channelconnect = {}
-langm = {}
+chatsettings = TTLCache(100000, 3600)
+fileids = TTLCache(10000, 86400)
 loop = {}
+spotifymatches = TTLCache(50000, 86400)
 maintenance = []
-nonadmin = {}
-pause = {}
-playmode = {}
-playtype = {}
-skipmode = {}
+
+
+class ActiveCall:
+    __slots__ = ("assistant", "video", "paused", "start", "speed")
+
+    def __init__(self, assistant: int):
+        self.assistant = assistant
+        self.video = False
+        self.paused = None
+        self.start = time.monotonic()
+        self.speed = 1.0
+
+
+class ChatSettings:
+    __slots__ = (
+        "chat_id",
+        "lang",
+        "playmode",
+        "playtype",
+        "cmode",
+        "upvotes",
+        "skipmode",
+        "nonadmin",
+    )
+    defaults = {
+        "lang": "en",
+        "playmode": "Direct",
+        "playtype": "Everyone",
+        "cmode": None,
+        "upvotes": 5,
+        "skipmode": True,
+        "nonadmin": False,
+    }
+
+    def __init__(self, chat_id: int, doc: dict = None):
+        self.chat_id = chat_id
+        doc = doc or {}
+        for key, value in self.defaults.items():
+            setattr(self, key, doc.get(key, value))
+
+    async def set(self, key: str, value):
+        setattr(self, key, value)
+        await chatsettingsdb.update_one(
+            {"chat_id": self.chat_id}, {"$set": {key: value}}, upsert=True
+        )
+
+
+LEGACY_SETTINGS = (
+    (langdb, "lang", lambda x: x["lang"]),
+    (playmodedb, "playmode", lambda x: x["mode"]),
+    (playtypedb, "playtype", lambda x: x["mode"]),
+    (channeldb, "cmode", lambda x: x["mode"]),
+    (countdb, "upvotes", lambda x: x["mode"]),
+    (skipdb, "skipmode", lambda x: False),
+    (authdb, "nonadmin", lambda x: True),
+)
+
+
+async def get_legacy_settings(chat_id: int) -> dict:
+    values = {}
+    for collection, key, value in LEGACY_SETTINGS:
+        doc = await collection.find_one({"chat_id": chat_id})
+        if not doc:
+            continue
+        try:
+            values[key] = value(doc)
+        except KeyError:
+            continue
+    return values
+
+
+async def get_chat_settings(chat_id: int) -> ChatSettings:
+    settings = chatsettings.get(chat_id)
+    if settings is None:
+        doc = await chatsettingsdb.find_one({"chat_id": chat_id})
+        if doc is None:
+            doc = await get_legacy_settings(chat_id)
+            if doc:
+                await chatsettingsdb.update_one(
+                    {"chat_id": chat_id}, {"$set": doc}, upsert=True
+                )
+        settings = chatsettings.get(chat_id)
+        if settings is None:
+            settings = ChatSettings(chat_id, doc)
+            chatsettings.set(chat_id, settings)
+    return settings
+
+
+async def load_chat_settings() -> int:
+    docs = {}
+    async for doc in chatsettingsdb.find({}):
+        docs[doc["chat_id"]] = doc
+    legacy = {}
+    for collection, key, value in LEGACY_SETTINGS:
+        async for doc in collection.find({}):
+            chat_id = doc.get("chat_id")
+            if chat_id is None or key in docs.get(chat_id, {}):
+                continue
+            try:
+                legacy.setdefault(chat_id, {})[key] = value(doc)
+            except KeyError:
+                continue
+    if legacy:
+        await chatsettingsdb.bulk_write(
+            [
+                UpdateOne({"chat_id": chat_id}, {"$set": values}, upsert=True)
+                for chat_id, values in legacy.items()
+            ]
+        )
+        for chat_id, values in legacy.items():
+            docs.setdefault(chat_id, {}).update(values)
+    for chat_id, doc in docs.items():
+        chatsettings.set(chat_id, ChatSettings(chat_id, doc))
+    return len(docs)
 
 
 async def get_assistant_number(chat_id: int) -> str:
@@ -45,16 +162,7 @@ async def get_assistant_number(chat_id: int) -> str:
 
 
 async def get_client(assistant: int):
-    if int(assistant) == 1:
-        return userbot.one
-    elif int(assistant) == 2:
-        return userbot.two
-    elif int(assistant) == 3:
-        return userbot.three
-    elif int(assistant) == 4:
-        return userbot.four
-    elif int(assistant) == 5:
-        return userbot.five
+    return registry.client(assistant)
 
 
 async def set_assistant_new(chat_id, number):
@@ -66,134 +174,77 @@ async def set_assistant_new(chat_id, number):
     )
 
 
-async def set_assistant(chat_id):
-    from ShrutixMusic.core.userbot import assistants
-
-    ran_assistant = random.choice(assistants)
-    assistantdict[chat_id] = ran_assistant
+async def set_calls_assistant(chat_id):
+    assistant = registry.pick(chat_id)
+    if assistant is None:
+        raise AssistantErr("No assistant is available to join the voice chat.")
+    assistantdict[chat_id] = assistant
     await assdb.update_one(
         {"chat_id": chat_id},
-        {"$set": {"assistant": ran_assistant}},
+        {"$set": {"assistant": assistant}},
         upsert=True,
     )
-    userbot = await get_client(ran_assistant)
-    return userbot
+    return assistant
 
 
-async def get_assistant(chat_id: int) -> str:
-    from ShrutixMusic.core.userbot import assistants
+async def set_assistant(chat_id):
+    assistant = await set_calls_assistant(chat_id)
+    return registry.client(assistant)
 
-    assistant = assistantdict.get(chat_id)
-    if not assistant:
-        dbassistant = await assdb.find_one({"chat_id": chat_id})
-        if not dbassistant:
-            userbot = await set_assistant(chat_id)
-            return userbot
-        else:
-            got_assis = dbassistant["assistant"]
-            if got_assis in assistants:
-                assistantdict[chat_id] = got_assis
-                userbot = await get_client(got_assis)
-                return userbot
-            else:
-                userbot = await set_assistant(chat_id)
-                return userbot
-    else:
-        if assistant in assistants:
-            userbot = await get_client(assistant)
-            return userbot
-        else:
-            userbot = await set_assistant(chat_id)
-            return userbot
 
+async def get_call_assistant(chat_id: int) -> int:
+    call = active.get(chat_id)
+    if call and call.assistant in registry:
+        return call.assistant
+    assistant = assistantdict.get(chat_id)
+    if assistant in registry:
+        return assistant
+    dbassistant = await assdb.find_one({"chat_id": chat_id})
+    if dbassistant and dbassistant["assistant"] in registry:
+        return dbassistant["assistant"]
+    return None
+
+
+async def get_assistant_id(chat_id: int) -> int:
+    call = active.get(chat_id)
+    if call and call.assistant in registry:
+        return call.assistant
+    assistant = assistantdict.get(chat_id)
+    if assistant in registry:
+        return assistant
+    dbassistant = await assdb.find_one({"chat_id": chat_id})
+    if dbassistant and dbassistant["assistant"] in registry:
+        assistantdict[chat_id] = dbassistant["assistant"]
+        return dbassistant["assistant"]
+    return await set_calls_assistant(chat_id)
 
-async def set_calls_assistant(chat_id):
-    from ShrutixMusic.core.userbot import assistants
 
-    ran_assistant = random.choice(assistants)
-    assistantdict[chat_id] = ran_assistant
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": ran_assistant}},
-        upsert=True,
-    )
-    return ran_assistant
+async def get_assistant(chat_id: int) -> str:
+    return registry.client(await get_assistant_id(chat_id))
 
 
 async def group_assistant(self, chat_id: int) -> int:
-    from ShrutixMusic.core.userbot import assistants
-
-    assistant = assistantdict.get(chat_id)
-    if not assistant:
-        dbassistant = await assdb.find_one({"chat_id": chat_id})
-        if not dbassistant:
-            assis = await set_calls_assistant(chat_id)
-        else:
-            assis = dbassistant["assistant"]
-            if assis in assistants:
-                assistantdict[chat_id] = assis
-                assis = assis
-            else:
-                assis = await set_calls_assistant(chat_id)
-    else:
-        if assistant in assistants:
-            assis = assistant
-        else:
-            assis = await set_calls_assistant(chat_id)
-    if int(assis) == 1:
-        return self.one
-    elif int(assis) == 2:
-        return self.two
-    elif int(assis) == 3:
-        return self.three
-    elif int(assis) == 4:
-        return self.four
-    elif int(assis) == 5:
-        return self.five
+    return registry.calls(await get_assistant_id(chat_id))
 
 
 async def is_skipmode(chat_id: int) -> bool:
-    mode = skipmode.get(chat_id)
-    if not mode:
-        user = await skipdb.find_one({"chat_id": chat_id})
-        if not user:
-            skipmode[chat_id] = True
-            return True
-        skipmode[chat_id] = False
-        return False
-    return mode
+    return (await get_chat_settings(chat_id)).skipmode
 
 
 async def skip_on(chat_id: int):
-    skipmode[chat_id] = True
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if user:
-        return await skipdb.delete_one({"chat_id": chat_id})
+    await (await get_chat_settings(chat_id)).set("skipmode", True)
 
 
 async def skip_off(chat_id: int):
-    skipmode[chat_id] = False
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if not user:
-        return await skipdb.insert_one({"chat_id": chat_id})
+    await (await get_chat_settings(chat_id)).set("skipmode", False)
 
 
 async def get_upvote_count(chat_id: int) -> int:
-    mode = count.get(chat_id)
-    if not mode:
-        mode = await countdb.find_one({"chat_id": chat_id})
-        if not mode:
-            return 5
-        count[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await get_chat_settings(chat_id)).upvotes
 
 
 async def set_upvotes(chat_id: int, mode: int):
-    count[chat_id] = mode
-    await countdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await (await get_chat_settings(chat_id)).set("upvotes", mode)
 
 
 async def is_autoend() -> bool:
@@ -226,168 +277,125 @@ async def set_loop(chat_id: int, mode: int):
 
 
 async def get_cmode(chat_id: int) -> int:
-    mode = channelconnect.get(chat_id)
-    if not mode:
-        mode = await channeldb.find_one({"chat_id": chat_id})
-        if not mode:
-            return None
-        channelconnect[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await get_chat_settings(chat_id)).cmode
 
 
 async def set_cmode(chat_id: int, mode: int):
-    channelconnect[chat_id] = mode
-    await channeldb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await (await get_chat_settings(chat_id)).set("cmode", mode)
 
 
 async def get_playtype(chat_id: int) -> str:
-    mode = playtype.get(chat_id)
-    if not mode:
-        mode = await playtypedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playtype[chat_id] = "Everyone"
-            return "Everyone"
-        playtype[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await get_chat_settings(chat_id)).playtype
 
 
 async def set_playtype(chat_id: int, mode: str):
-    playtype[chat_id] = mode
-    await playtypedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await (await get_chat_settings(chat_id)).set("playtype", mode)
 
 
 async def get_playmode(chat_id: int) -> str:
-    mode = playmode.get(chat_id)
-    if not mode:
-        mode = await playmodedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playmode[chat_id] = "Direct"
-            return "Direct"
-        playmode[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await get_chat_settings(chat_id)).playmode
 
 
 async def set_playmode(chat_id: int, mode: str):
-    playmode[chat_id] = mode
-    await playmodedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await (await get_chat_settings(chat_id)).set("playmode", mode)
 
 
 async def get_lang(chat_id: int) -> str:
-    mode = langm.get(chat_id)
-    if not mode:
-        lang = await langdb.find_one({"chat_id": chat_id})
-        if not lang:
-            langm[chat_id] = "en"
-            return "en"
-        langm[chat_id] = lang["lang"]
-        return lang["lang"]
-    return mode
+    return (await get_chat_settings(chat_id)).lang
 
 
 async def set_lang(chat_id: int, lang: str):
-    langm[chat_id] = lang
-    await langdb.update_one({"chat_id": chat_id}, {"$set": {"lang": lang}}, upsert=True)
+    await (await get_chat_settings(chat_id)).set("lang", lang)
 
 
 async def is_music_playing(chat_id: int) -> bool:
-    mode = pause.get(chat_id)
-    if not mode:
-        return False
-    return mode
+    call = active.get(chat_id)
+    return bool(call) and call.paused is None
 
 
 async def music_on(chat_id: int):
-    pause[chat_id] = True
+    call = active.get(chat_id)
+    if call and call.paused is not None:
+        call.start += time.monotonic() - call.paused
+        call.paused = None
 
 
 async def music_off(chat_id: int):
-    pause[chat_id] = False
+    call = active.get(chat_id)
+    if call and call.paused is None:
+        call.paused = time.monotonic()
+
+
+async def set_played(chat_id: int, seconds: int = 0, speed: float = 1.0):
+    call = active.get(chat_id)
+    if call:
+        call.speed = speed
+        call.start = (call.paused or time.monotonic()) - seconds / speed
+
+
+async def get_played(chat_id: int) -> int:
+    call = active.get(chat_id)
+    if not call:
+        return 0
+    return int(((call.paused or time.monotonic()) - call.start) * call.speed)
 
 
 async def get_active_chats() -> list:
-    return active
+    return list(active)
 
 
 async def is_active_chat(chat_id: int) -> bool:
-    if chat_id not in active:
-        return False
-    else:
-        return True
+    return chat_id in active
 
 
 async def add_active_chat(chat_id: int):
-    if chat_id not in active:
-        active.append(chat_id)
+    if chat_id in active:
+        return
+    assistant = assistantdict.get(chat_id)
+    active[chat_id] = ActiveCall(assistant)
+    registry.join(assistant, chat_id)
 
 
 async def remove_active_chat(chat_id: int):
-    if chat_id in active:
-        active.remove(chat_id)
+    registry.leave(chat_id)
+    activevideo.discard(chat_id)
+    active.pop(chat_id, None)
 
 
 async def get_active_video_chats() -> list:
-    return activevideo
+    return list(activevideo)
 
 
 async def is_active_video_chat(chat_id: int) -> bool:
-    if chat_id not in activevideo:
-        return False
-    else:
-        return True
+    return chat_id in activevideo
 
 
 async def add_active_video_chat(chat_id: int):
-    if chat_id not in activevideo:
-        activevideo.append(chat_id)
+    activevideo.add(chat_id)
+    if chat_id in active:
+        active[chat_id].video = True
 
 
 async def remove_active_video_chat(chat_id: int):
-    if chat_id in activevideo:
-        activevideo.remove(chat_id)
+    activevideo.discard(chat_id)
+    if chat_id in active:
+        active[chat_id].video = False
 
 
 async def check_nonadmin_chat(chat_id: int) -> bool:
-    user = await authdb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
+    return (await get_chat_settings(chat_id)).nonadmin
 
 
 async def is_nonadmin_chat(chat_id: int) -> bool:
-    mode = nonadmin.get(chat_id)
-    if not mode:
-        user = await authdb.find_one({"chat_id": chat_id})
-        if not user:
-            nonadmin[chat_id] = False
-            return False
-        nonadmin[chat_id] = True
-        return True
-    return mode
+    return (await get_chat_settings(chat_id)).nonadmin
 
 
 async def add_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = True
-    is_admin = await check_nonadmin_chat(chat_id)
-    if is_admin:
-        return
-    return await authdb.insert_one({"chat_id": chat_id})
+    await (await get_chat_settings(chat_id)).set("nonadmin", True)
 
 
 async def remove_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = False
-    is_admin = await check_nonadmin_chat(chat_id)
-    if not is_admin:
-        return
-    return await authdb.delete_one({"chat_id": chat_id})
+    await (await get_chat_settings(chat_id)).set("nonadmin", False)
 
 
 async def is_on_off(on_off: int) -> bool:
@@ -644,3 +652,57 @@ async def remove_banned_user(user_id: int):
     if not is_gbanned:
         return
     return await blockeddb.delete_one({"user_id": user_id})
+
+
+async def get_yt_meta(vidid: str) -> Union[dict, None]:
+    return await ytmetadb.find_one({"vidid": vidid}, {"_id": 0})
+
+
+async def save_yt_meta(vidid: str, meta: dict):
+    await ytmetadb.update_one({"vidid": vidid}, {"$set": meta}, upsert=True)
+
+
+async def get_spotify_matches(track_ids: list) -> dict:
+    matches = {}
+    missing = []
+    for track_id in track_ids:
+        vidid = spotifymatches.get(track_id)
+        if vidid:
+            matches[track_id] = vidid
+        else:
+            missing.append(track_id)
+    if missing:
+        async for saved in spotifydb.find({"track_id": {"$in": missing}}):
+            spotifymatches.set(saved["track_id"], saved["vidid"])
+            matches[saved["track_id"]] = saved["vidid"]
+    return matches
+
+
+async def save_spotify_match(track_id: str, vidid: str):
+    spotifymatches.set(track_id, vidid)
+    await spotifydb.update_one(
+        {"track_id": track_id}, {"$set": {"vidid": vidid}}, upsert=True
+    )
+
+
+async def get_file_id(key: str) -> Union[str, None]:
+    file_id = fileids.get(key)
+    if file_id:
+        return file_id
+    saved = await fileiddb.find_one({"key": key})
+    if not saved:
+        return None
+    fileids.set(key, saved["file_id"])
+    return saved["file_id"]
+
+
+async def save_file_id(key: str, file_id: str):
+    fileids.set(key, file_id)
+    await fileiddb.update_one(
+        {"key": key}, {"$set": {"file_id": file_id}}, upsert=True
+    )
+
+
+async def delete_file_id(key: str):
+    fileids.pop(key)
+    await fileiddb.delete_one({"key": key})
@@ -3,6 +3,7 @@ import asyncio
 from pyrogram.enums import ChatMemberStatus
 from pyrogram.errors import (
     ChatAdminRequired,
+    FloodWait,
     InviteRequestSent,
     UserAlreadyParticipant,
     UserNotParticipant,
@@ -10,13 +11,12 @@ from pyrogram.errors import (
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from ShrutixMusic import YouTube, nand
+from ShrutixMusic.core.assistants import registry
 from ShrutixMusic.misc import SUDOERS
 from ShrutixMusic.utils.database import (
     get_assistant,
-    get_cmode,
-    get_lang,
-    get_playmode,
-    get_playtype,
+    get_assistant_number,
+    get_chat_settings,
     is_active_chat,
     is_maintenance,
 )
@@ -29,8 +29,8 @@ links = {}
 
 def PlayWrapper(command):
     async def wrapper(client, message):
-        language = await get_lang(message.chat.id)
-        _ = get_string(language)
+        settings = await get_chat_settings(message.chat.id)
+        _ = get_string(settings.lang)
         if message.sender_chat:
             upl = InlineKeyboardMarkup(
                 [
@@ -78,7 +78,7 @@ def PlayWrapper(command):
                     reply_markup=InlineKeyboardMarkup(buttons),
                 )
         if message.command[0][0] == "c":
-            chat_id = await get_cmode(message.chat.id)
+            chat_id = settings.cmode
             if chat_id is None:
                 return await message.reply_text(_["setting_7"])
             try:
@@ -89,8 +89,8 @@ def PlayWrapper(command):
         else:
             chat_id = message.chat.id
             channel = None
-        playmode = await get_playmode(message.chat.id)
-        playty = await get_playtype(message.chat.id)
+        playmode = settings.playmode
+        playty = settings.playtype
         if playty != "Everyone":
             if message.from_user.id not in SUDOERS:
                 admins = adminlist.get(message.chat.id)
@@ -168,6 +168,11 @@ def PlayWrapper(command):
                     await myu.edit(_["call_5"].format(nand.mention))
                 except UserAlreadyParticipant:
                     pass
+                except FloodWait as e:
+                    registry.error(await get_assistant_number(chat_id), flood=e.value)
+                    return await message.reply_text(
+                        _["call_3"].format(nand.mention, type(e).__name__)
+                    )
                 except Exception as e:
                     return await message.reply_text(
                         _["call_3"].format(nand.mention, type(e).__name__)
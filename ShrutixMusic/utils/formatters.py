@@ -1,5 +1,11 @@
+import asyncio
 import json
-import subprocess
+import os
+
+from ShrutixMusic.core.cache import TTLCache
+
+probes = TTLCache(4096, 86400)
+probing = asyncio.Semaphore(4)
 
 
 def get_readable_time(seconds: int) -> str:
@@ -116,32 +122,69 @@ def speed_converter(seconds, speed):
     return "-"
 
 
-def check_duration(file_path):
-    command = [
-        "ffprobe",
-        "-loglevel",
-        "quiet",
-        "-print_format",
-        "json",
-        "-show_format",
-        "-show_streams",
-        file_path,
-    ]
-
-    pipe = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    out, err = pipe.communicate()
-    _json = json.loads(out)
-
-    if "format" in _json:
-        if "duration" in _json["format"]:
-            return float(_json["format"]["duration"])
-
-    if "streams" in _json:
-        for s in _json["streams"]:
+async def probe(path: str, timeout: int = 30) -> dict:
+    try:
+        stat = os.stat(path)
+        key, ttl = (path, stat.st_size, stat.st_mtime), None
+    except OSError:
+        key, ttl = path, 600
+    info = probes.get(key)
+    if info is not None:
+        return info
+    async with probing:
+        info = probes.get(key)
+        if info is not None:
+            return info
+        proc = await asyncio.create_subprocess_exec(
+            "ffprobe",
+            "-loglevel",
+            "quiet",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
+            path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+    _json = json.loads(out or b"{}")
+    duration = None
+    if "duration" in _json.get("format", {}):
+        duration = float(_json["format"]["duration"])
+    else:
+        for s in _json.get("streams", []):
             if "duration" in s:
-                return float(s["duration"])
-
-    return "Unknown"
+                duration = float(s["duration"])
+                break
+    try:
+        bitrate = int(_json["format"]["bit_rate"])
+    except:
+        bitrate = None
+    info = {
+        "duration": duration,
+        "codecs": [s.get("codec_name") for s in _json.get("streams", [])],
+        "bitrate": bitrate,
+        "video": any(
+            s.get("codec_type") == "video"
+            and not s.get("disposition", {}).get("attached_pic")
+            for s in _json.get("streams", [])
+        ),
+    }
+    probes.set(key, info, ttl)
+    return info
+
+
+async def check_duration(file_path):
+    info = await probe(file_path)
+    if info["duration"] is None:
+        return "Unknown"
+    return info["duration"]
 
 
 formats = [
@@ -1,16 +1,11 @@
-import aiohttp
+from ShrutixMusic.core.http import http
 
 BASE = "https://batbin.me/"
 
 
-async def post(url: str, *args, **kwargs):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, *args, **kwargs) as resp:
-            try:
-                data = await resp.json()
-            except Exception:
-                data = await resp.text()
-        return data
+async def post(url: str, **kwargs):
+    _, data = await http.post(url, **kwargs)
+    return data
 
 
 async def ShrutiBin(text):
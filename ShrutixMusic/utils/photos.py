@@ -0,0 +1,25 @@
+from pyrogram.errors import BadRequest
+
+from ShrutixMusic.utils.database import delete_file_id, get_file_id, save_file_id
+
+
+async def send_photo(method, *args, photo, **kwargs):
+    key = photo if isinstance(photo, str) else None
+    file_id = None
+    if key:
+        try:
+            file_id = await get_file_id(key)
+        except:
+            pass
+    if file_id:
+        try:
+            return await method(*args, photo=file_id, **kwargs)
+        except BadRequest:
+            await delete_file_id(key)
+    message = await method(*args, photo=photo, **kwargs)
+    if key and message and message.photo:
+        try:
+            await save_file_id(key, message.photo.file_id)
+        except:
+            pass
+    return message
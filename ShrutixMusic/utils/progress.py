@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+from pyrogram.errors import (
+    ChannelPrivate,
+    FloodWait,
+    Forbidden,
+    MessageIdInvalid,
+    MessageNotModified,
+    PeerIdInvalid,
+)
+
+from ShrutixMusic import nand
+from ShrutixMusic.logging import LOGGER
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ProgressUpdater:
+    def __init__(self, interval: int, rate: float, capacity: int):
+        self.interval = interval
+        self.rate = rate
+        self.bucket = TokenBucket(rate, capacity)
+        self.sources = []
+        self.subscribers = {}
+        self.rendered = {}
+        self.dead = set()
+        self.task = None
+
+    def start(self):
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def add_source(self, source):
+        self.sources.append(source)
+        self.start()
+
+    def subscribe(self, message, render):
+        self.subscribers[(message.chat.id, message.id)] = render
+        self.start()
+
+    def unsubscribe(self, message):
+        self.subscribers.pop((message.chat.id, message.id), None)
+
+    async def collect(self) -> dict:
+        pending = {}
+        for source in self.sources:
+            try:
+                for chat_id, message_id, markup in await source():
+                    pending[(chat_id, message_id)] = markup
+            except Exception as e:
+                LOGGER(__name__).warning(f"Progress source failed: {e}")
+        for key, render in list(self.subscribers.items()):
+            try:
+                markup = await render()
+            except Exception:
+                markup = None
+            if markup is None:
+                self.subscribers.pop(key, None)
+                continue
+            pending[key] = markup
+        return pending
+
+    async def run(self):
+        while not await asyncio.sleep(self.interval):
+            pending = await self.collect()
+            for key in list(self.rendered):
+                if key not in pending:
+                    self.rendered.pop(key)
+            self.dead.intersection_update(pending)
+            flooded = False
+            for key, markup in pending.items():
+                if key in self.dead:
+                    continue
+                sign = tuple(
+                    button.text for row in markup.inline_keyboard for button in row
+                )
+                if self.rendered.get(key) == sign:
+                    continue
+                await self.bucket.acquire()
+                try:
+                    await nand.edit_message_reply_markup(*key, reply_markup=markup)
+                    self.rendered[key] = sign
+                except MessageNotModified:
+                    self.rendered[key] = sign
+                except FloodWait as e:
+                    flooded = True
+                    self.bucket.rate = max(self.rate / 16, self.bucket.rate / 2)
+                    LOGGER(__name__).warning(
+                        f"FloodWait of {e.value}s on progress edits, rate lowered to {self.bucket.rate:.2f}/s"
+                    )
+                    await asyncio.sleep(e.value)
+                except (Forbidden, MessageIdInvalid, ChannelPrivate, PeerIdInvalid):
+                    self.dead.add(key)
+                    self.subscribers.pop(key, None)
+                except Exception as e:
+                    LOGGER(__name__).warning(f"Progress edit failed: {e}")
+            if not flooded and self.bucket.rate < self.rate:
+                self.bucket.rate = min(self.rate, self.bucket.rate * 1.25)
+
+
+progress = ProgressUpdater(7, 20, 20)
@@ -1,18 +1,22 @@
-import os
-
-from config import autoclean
+from ShrutixMusic.core.cache import downloadcache, playbackcache
 
 
 async def auto_clean(popped):
     try:
-        rem = popped["file"]
-        autoclean.remove(rem)
-        count = autoclean.count(rem)
-        if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
-                try:
-                    os.remove(rem)
-                except:
-                    pass
+        downloadcache.release(popped["file"])
+        if popped.get("speed_path"):
+            playbackcache.release(popped["speed_path"])
     except:
         pass
+
+
+async def reset_speed(entry):
+    if entry.get("old_dur"):
+        entry["dur"] = entry["old_dur"]
+        entry["seconds"] = entry["old_second"]
+        entry["old_dur"] = None
+        entry["old_second"] = None
+    if entry.get("speed_path"):
+        playbackcache.release(entry["speed_path"])
+        entry["speed_path"] = None
+    entry["speed"] = 1.0
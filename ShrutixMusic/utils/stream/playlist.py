@@ -0,0 +1,150 @@
+import asyncio
+from collections import deque
+
+import config
+from ShrutixMusic import Spotify, YouTube
+from ShrutixMusic.logging import LOGGER
+from ShrutixMusic.misc import db
+from ShrutixMusic.utils.stream.queue import put_queue
+
+resolving = asyncio.Semaphore(8)
+cursors = {}
+expanding = {}
+
+
+class PlaylistCursor:
+    __slots__ = (
+        "fetch",
+        "offset",
+        "videoid",
+        "done",
+        "original_chat_id",
+        "user_name",
+        "user_id",
+        "video",
+    )
+
+    def __init__(self, fetch, offset: int, videoid: bool):
+        self.fetch = fetch
+        self.offset = offset
+        self.videoid = videoid
+        self.done = False
+        self.original_chat_id = None
+        self.user_name = None
+        self.user_id = None
+        self.video = None
+
+    async def next(self, count: int) -> list:
+        if self.done:
+            return []
+        try:
+            items = await self.fetch(self.offset, count)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Failed to fetch playlist page: {e}")
+            items = []
+        self.offset += len(items)
+        if len(items) < count:
+            self.done = True
+        return [x for x in items if x]
+
+
+def playlist_cursor(ptype, plist_id, result):
+    limit = config.PLAYLIST_FETCH_LIMIT
+    first = [x for x in result[:limit] if x]
+    if ptype == "apple":
+
+        async def fetch(offset, count):
+            return result[offset : offset + count]
+
+        cursor = PlaylistCursor(fetch, limit, False)
+        return first, cursor if len(result) > limit else None
+    if len(result) < limit:
+        return first, None
+    if ptype == "yt":
+
+        async def fetch(offset, count):
+            return await YouTube.playlist(plist_id, count, None, True, offset + 1)
+
+        return first, PlaylistCursor(fetch, limit, True)
+    if ptype == "spplay":
+
+        async def fetch(offset, count):
+            return await Spotify.playlist_page(plist_id, offset, count)
+
+        return first, PlaylistCursor(fetch, limit, False)
+    if ptype == "spalbum":
+
+        async def fetch(offset, count):
+            return await Spotify.album_page(plist_id, offset, count)
+
+        return first, PlaylistCursor(fetch, limit, False)
+    return [x for x in result if x], None
+
+
+async def resolve(search, videoid):
+    async with resolving:
+        try:
+            details = await YouTube.details(search, videoid)
+        except:
+            return None
+    if not videoid:
+        await Spotify.remember(search, details[4])
+    return details
+
+
+def add_cursor(chat_id, cursor, original_chat_id, user_name, user_id, video):
+    cursor.original_chat_id = original_chat_id
+    cursor.user_name = user_name
+    cursor.user_id = user_id
+    cursor.video = video
+    cursors.setdefault(chat_id, deque()).append(cursor)
+
+
+def clear_cursors(chat_id):
+    cursors.pop(chat_id, None)
+
+
+async def expand(chat_id) -> int:
+    task = expanding.get(chat_id)
+    if not task:
+        task = asyncio.create_task(_expand(chat_id))
+        expanding[chat_id] = task
+        task.add_done_callback(lambda _: expanding.pop(chat_id, None))
+    return await asyncio.shield(task)
+
+
+async def _expand(chat_id) -> int:
+    pending = cursors.get(chat_id)
+    while pending:
+        cursor = pending[0]
+        items = await cursor.next(config.PLAYLIST_FETCH_LIMIT)
+        if cursor.done:
+            pending.popleft()
+        results = await asyncio.gather(*[resolve(x, cursor.videoid) for x in items])
+        if cursors.get(chat_id) is not pending or db.get(chat_id) is None:
+            return 0
+        added = 0
+        for details in results:
+            if not details:
+                continue
+            title, duration_min, duration_sec, thumbnail, vidid = details
+            if str(duration_min) == "None":
+                continue
+            if duration_sec > config.DURATION_LIMIT:
+                continue
+            await put_queue(
+                chat_id,
+                cursor.original_chat_id,
+                f"vid_{vidid}",
+                title,
+                duration_min,
+                cursor.user_name,
+                vidid,
+                cursor.user_id,
+                "video" if cursor.video else "audio",
+            )
+            added += 1
+        if added:
+            return added
+    cursors.pop(chat_id, None)
+    return 0
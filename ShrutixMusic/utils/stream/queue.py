@@ -1,9 +1,9 @@
-import asyncio
 from typing import Union
 
-from ShrutixMusic.misc import db
+from ShrutixMusic.core.cache import downloadcache
+from ShrutixMusic.misc import ChatQueue, QueueEntry, db
 from ShrutixMusic.utils.formatters import check_duration, seconds_to_min
-from config import autoclean, time_to_seconds
+from config import time_to_seconds
 
 
 async def put_queue(
@@ -23,28 +23,36 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "user_id": user_id,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
+    put = QueueEntry(
+        title=title,
+        dur=duration,
+        streamtype=stream,
+        by=user,
+        user_id=user_id,
+        chat_id=original_chat_id,
+        file=file,
+        vidid=vidid,
+        seconds=duration_in_seconds,
+    )
     if forceplay:
         check = db.get(chat_id)
         if check:
-            check.insert(0, put)
+            check.appendleft(put)
         else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+            db[chat_id] = ChatQueue([put])
     else:
         db[chat_id].append(put)
-    autoclean.append(file)
+    downloadcache.acquire(file)
+
+
+def attach_file(chat_id, entry, file_path):
+    check = db.get(chat_id)
+    if not check or not any(x is entry for x in check):
+        return
+    if "vid_" not in entry["file"]:
+        return
+    downloadcache.acquire(file_path)
+    entry["file"] = file_path
 
 
 async def put_queue_index(
@@ -60,32 +68,28 @@ async def put_queue_index(
 ):
     if "20.212.146.162" in vidid:
         try:
-            dur = await asyncio.get_event_loop().run_in_executor(
-                None, check_duration, vidid
-            )
+            dur = await check_duration(vidid)
             duration = seconds_to_min(dur)
         except:
             duration = "ᴜʀʟ sᴛʀᴇᴀᴍ"
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
+    put = QueueEntry(
+        title=title,
+        dur=duration,
+        streamtype=stream,
+        by=user,
+        chat_id=original_chat_id,
+        file=file,
+        vidid=vidid,
+        seconds=dur,
+    )
     if forceplay:
         check = db.get(chat_id)
         if check:
-            check.insert(0, put)
+            check.appendleft(put)
         else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+            db[chat_id] = ChatQueue([put])
     else:
         db[chat_id].append(put)
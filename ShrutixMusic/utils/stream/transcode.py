@@ -0,0 +1,105 @@
+import asyncio
+import os
+import re
+
+import config
+from ShrutixMusic.core.cache import downloadcache, transcodecache
+from ShrutixMusic.logging import LOGGER
+from ShrutixMusic.utils.formatters import probe
+
+transcoding = {}
+streaming = {}
+saved = {"streams": 0, "seconds": 0.0}
+
+
+def target(file_path: str) -> str:
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(transcodecache.path, f"{stem}.wav")
+
+
+async def _transcode(file_path: str, out: str):
+    info = await probe(file_path)
+    if not info or info.get("video"):
+        return
+    if not os.path.isdir(transcodecache.path):
+        os.makedirs(transcodecache.path)
+    temp = f"{out}.part"
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-y",
+        "-benchmark",
+        "-i",
+        file_path,
+        "-vn",
+        "-ac",
+        "2",
+        "-ar",
+        "48000",
+        "-c:a",
+        "pcm_s16le",
+        "-f",
+        "wav",
+        temp,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        try:
+            os.remove(temp)
+        except:
+            pass
+        LOGGER(__name__).warning(f"Failed to transcode {file_path}")
+        return
+    os.replace(temp, out)
+    transcodecache.touch(out)
+    match = re.search(rb"utime=([\d.]+)s\s+stime=([\d.]+)s", stderr)
+    if match:
+        transcodecache.annotate(out, float(match.group(1)) + float(match.group(2)))
+    if transcodecache.dirty:
+        transcodecache.save()
+
+
+def transcode(file_path: str):
+    if not config.TRANSCODE_CACHE or not downloadcache.key(file_path):
+        return
+    out = target(file_path)
+    if out in transcoding or os.path.exists(out):
+        return
+    task = asyncio.create_task(_transcode(file_path, out))
+    transcoding[out] = task
+    task.add_done_callback(lambda _: transcoding.pop(out, None))
+
+
+def hold(chat_id, out):
+    previous = streaming.pop(chat_id, None)
+    if transcodecache.key(out):
+        transcodecache.acquire(out)
+        streaming[chat_id] = out
+    if previous:
+        transcodecache.release(previous)
+
+
+def release_transcoded(chat_id):
+    previous = streaming.pop(chat_id, None)
+    if previous:
+        transcodecache.release(previous)
+
+
+def transcoded(file_path: str, chat_id, record: bool = True) -> str:
+    out = file_path
+    if config.TRANSCODE_CACHE and downloadcache.key(file_path):
+        out = target(file_path)
+        if out in transcoding or not os.path.exists(out):
+            out = file_path
+    hold(chat_id, out)
+    if out == file_path:
+        return file_path
+    if record:
+        cost = transcodecache.meta.get(out, 0.0)
+        saved["streams"] += 1
+        saved["seconds"] += cost
+        LOGGER(__name__).info(
+            f"Streaming pre-transcoded {os.path.basename(out)}, saved {cost:.2f}s CPU ({saved['seconds']:.2f}s over {saved['streams']} streams)"
+        )
+    return out
@@ -1,15 +1,27 @@
+import asyncio
+import multiprocessing
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 
 import aiofiles
-import aiohttp
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
 from unidecode import unidecode
-from youtubesearchpython.__future__ import VideosSearch
 
-from ShrutixMusic import nand
+from ShrutixMusic import YouTube, nand
+from ShrutixMusic.core.cache import thumbcache
+from ShrutixMusic.core.http import http
 from config import YOUTUBE_IMG_URL
 
+fonts = {}
+rendering = {}
+renderer = None
+
+
+def load_fonts():
+    fonts["arial"] = ImageFont.truetype("ShrutixMusic/assets/font2.ttf", 30)
+    fonts["font"] = ImageFont.truetype("ShrutixMusic/assets/font.ttf", 30)
+
 
 def changeImageSize(maxWidth, maxHeight, image):
     widthRatio = maxWidth / image.size[0]
@@ -29,92 +41,129 @@ def clear(text):
     return title.strip()
 
 
+def render(source, out, name, title, duration, views, channel):
+    if not fonts:
+        load_fonts()
+    arial = fonts["arial"]
+    font = fonts["font"]
+    youtube = Image.open(source)
+    image1 = changeImageSize(1280, 720, youtube)
+    image2 = image1.convert("RGBA")
+    background = image2.filter(filter=ImageFilter.BoxBlur(10))
+    enhancer = ImageEnhance.Brightness(background)
+    background = enhancer.enhance(0.5)
+    draw = ImageDraw.Draw(background)
+    draw.text((1110, 8), unidecode(name), fill="white", font=arial)
+    draw.text(
+        (55, 560),
+        f"{channel} | {views[:23]}",
+        (255, 255, 255),
+        font=arial,
+    )
+    draw.text(
+        (57, 600),
+        clear(title),
+        (255, 255, 255),
+        font=font,
+    )
+    draw.line(
+        [(55, 660), (1220, 660)],
+        fill="white",
+        width=5,
+        joint="curve",
+    )
+    draw.ellipse(
+        [(918, 648), (942, 672)],
+        outline="white",
+        fill="white",
+        width=15,
+    )
+    draw.text(
+        (36, 685),
+        "00:00",
+        (255, 255, 255),
+        font=arial,
+    )
+    draw.text(
+        (1185, 685),
+        f"{duration[:23]}",
+        (255, 255, 255),
+        font=arial,
+    )
+    try:
+        os.remove(source)
+    except:
+        pass
+    background.save(out)
+
+
+def start_renderer():
+    global renderer
+    if renderer:
+        return
+    renderer = ProcessPoolExecutor(
+        2,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=load_fonts,
+    )
+    for _ in range(2):
+        renderer.submit(os.getpid)
+
+
+def stop_renderer():
+    global renderer
+    if renderer:
+        renderer.shutdown(wait=False, cancel_futures=True)
+        renderer = None
+
+
 async def get_thumb(videoid):
-    if os.path.isfile(f"cache/{videoid}.png"):
-        return f"cache/{videoid}.png"
+    path = f"cache/{videoid}.png"
+    if os.path.isfile(path):
+        thumbcache.touch(path)
+        return path
+    task = rendering.get(videoid)
+    if not task:
+        task = asyncio.ensure_future(_get_thumb(videoid))
+        rendering[videoid] = task
+        task.add_done_callback(lambda _: rendering.pop(videoid, None))
+    return await asyncio.shield(task)
 
-    url = f"https://www.youtube.com/watch?v={videoid}"
+
+async def _get_thumb(videoid):
     try:
-        results = VideosSearch(url, limit=1)
-        for result in (await results.next())["result"]:
-            try:
-                title = result["title"]
-                title = re.sub("\W+", " ", title)
-                title = title.title()
-            except:
-                title = "Unsupported Title"
-            try:
-                duration = result["duration"]
-            except:
-                duration = "Unknown Mins"
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            try:
-                views = result["viewCount"]["short"]
-            except:
-                views = "Unknown Views"
-            try:
-                channel = result["channel"]["name"]
-            except:
-                channel = "Unknown Channel"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thumbnail) as resp:
-                if resp.status == 200:
-                    f = await aiofiles.open(f"cache/thumb{videoid}.png", mode="wb")
-                    await f.write(await resp.read())
-                    await f.close()
-
-        youtube = Image.open(f"cache/thumb{videoid}.png")
-        image1 = changeImageSize(1280, 720, youtube)
-        image2 = image1.convert("RGBA")
-        background = image2.filter(filter=ImageFilter.BoxBlur(10))
-        enhancer = ImageEnhance.Brightness(background)
-        background = enhancer.enhance(0.5)
-        draw = ImageDraw.Draw(background)
-        arial = ImageFont.truetype("ShrutixMusic/assets/font2.ttf", 30)
-        font = ImageFont.truetype("ShrutixMusic/assets/font.ttf", 30)
-        draw.text((1110, 8), unidecode(nand.name), fill="white", font=arial)
-        draw.text(
-            (55, 560),
-            f"{channel} | {views[:23]}",
-            (255, 255, 255),
-            font=arial,
-        )
-        draw.text(
-            (57, 600),
-            clear(title),
-            (255, 255, 255),
-            font=font,
-        )
-        draw.line(
-            [(55, 660), (1220, 660)],
-            fill="white",
-            width=5,
-            joint="curve",
-        )
-        draw.ellipse(
-            [(918, 648), (942, 672)],
-            outline="white",
-            fill="white",
-            width=15,
-        )
-        draw.text(
-            (36, 685),
-            "00:00",
-            (255, 255, 255),
-            font=arial,
-        )
-        draw.text(
-            (1185, 685),
-            f"{duration[:23]}",
-            (255, 255, 255),
-            font=arial,
-        )
+        meta = await YouTube.metadata(videoid, True)
         try:
-            os.remove(f"cache/thumb{videoid}.png")
+            title = re.sub("\W+", " ", meta["title"])
+            title = title.title()
         except:
-            pass
-        background.save(f"cache/{videoid}.png")
+            title = "Unsupported Title"
+        duration = meta["duration_min"] or "Unknown Mins"
+        thumbnail = meta["thumbnail"]
+        views = meta["views"] or "Unknown Views"
+        channel = meta["channel"] or "Unknown Channel"
+
+        status, data = await http.get(thumbnail, "bytes")
+        if status == 200:
+            f = await aiofiles.open(f"cache/thumb{videoid}.png", mode="wb")
+            await f.write(data)
+            await f.close()
+
+        start_renderer()
+        await asyncio.get_running_loop().run_in_executor(
+            renderer,
+            render,
+            f"cache/thumb{videoid}.png",
+            f"cache/{videoid}.png",
+            nand.name,
+            title,
+            duration,
+            views,
+            channel,
+        )
+        thumbcache.touch(f"cache/{videoid}.png")
+        if thumbcache.dirty:
+            thumbcache.save()
         return f"cache/{videoid}.png"
     except Exception as e:
         print(e)
@@ -1,5 +1,5 @@
 import re
-from os import getenv
+from os import environ, getenv
 
 from dotenv import load_dotenv
 from pyrogram import filters
@@ -51,29 +51,57 @@ SPOTIFY_CLIENT_ID = getenv("SPOTIFY_CLIENT_ID", None)
 SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", None)
 
 
-# Maximum limit for fetching playlist's track from youtube, spotify, apple links.
+# Number of playlist tracks fetched at a time from youtube, spotify, apple links, the rest are queued as the queue runs low.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
 
 
+# Number of worker processes that keep yt-dlp loaded for extraction and downloads.
+YTDLP_WORKERS = int(getenv("YTDLP_WORKERS", 4))
+
+
+# Seconds before the current track ends at which the next queued track gets downloaded.
+PREFETCH_BEFORE = int(getenv("PREFETCH_BEFORE", 60))
+
+
+# Maximum size of the downloads cache and free disk space to keep (in bytes)
+DOWNLOADS_CACHE_LIMIT = int(getenv("DOWNLOADS_CACHE_LIMIT", 5368709120))
+DOWNLOADS_MIN_FREE = int(getenv("DOWNLOADS_MIN_FREE", 1073741824))
+
+# Maximum size of the pre-rendered playback speed variants kept for video streams (in bytes)
+PLAYBACK_CACHE_LIMIT = int(getenv("PLAYBACK_CACHE_LIMIT", 2147483648))
+
+# Set this to True to keep a 48kHz PCM copy of downloaded audio so streams skip decoding (uses more disk)
+TRANSCODE_CACHE = getenv("TRANSCODE_CACHE", "False").lower() in ("1", "true", "yes")
+TRANSCODE_CACHE_LIMIT = int(getenv("TRANSCODE_CACHE_LIMIT", 5368709120))
+
+# Maximum size in bytes of rendered thumbnails kept in the cache folder.
+THUMB_CACHE_LIMIT = int(getenv("THUMB_CACHE_LIMIT", 268435456))
+
+
 # Telegram audio and video file size limit (in bytes)
 TG_AUDIO_FILESIZE_LIMIT = int(getenv("TG_AUDIO_FILESIZE_LIMIT", 104857600))
 TG_VIDEO_FILESIZE_LIMIT = int(getenv("TG_VIDEO_FILESIZE_LIMIT", 1073741824))
 # Checkout https://www.gbmb.org/mb-to-bytes for converting mb to bytes
 
 
-# Get your pyrogram v2 session from @StringFatherBot on Telegram
-STRING1 = getenv("STRING_SESSION", None)
-STRING2 = getenv("STRING_SESSION2", None)
-STRING3 = getenv("STRING_SESSION3", None)
-STRING4 = getenv("STRING_SESSION4", None)
-STRING5 = getenv("STRING_SESSION5", None)
+# Get your pyrogram v2 sessions from @StringFatherBot on Telegram
+# Either list them all in STRING_SESSIONS (separated by spaces or commas)
+# or set them as STRING_SESSION, STRING_SESSION2, STRING_SESSION3 ... STRING_SESSIONn
+STRING_SESSIONS = [x for x in re.split(r"[\s,]+", getenv("STRING_SESSIONS", "")) if x]
+if not STRING_SESSIONS:
+    STRING_SESSIONS = [
+        environ[key]
+        for key in sorted(
+            (x for x in environ if re.fullmatch(r"STRING_SESSION\d*", x) and environ[x]),
+            key=lambda x: int(x[len("STRING_SESSION") :] or 1),
+        )
+    ]
 
 
 BANNED_USERS = filters.user()
 adminlist = {}
 lyrical = {}
 votemode = {}
-autoclean = []
 confirmer = {}
 
 